@@ -1,11 +1,16 @@
-from flask import Flask, request, jsonify, send_file
+import time
+import threading
+import multiprocessing
+from flask import Flask, Response, g, request, send_file
 from werkzeug.utils import secure_filename
 import os
+import uuid
 from flask_cors import CORS, cross_origin
-from subprocess import call
 
-from src.pipeline.predict_pipeline import FetchData
-from src.pipeline.download_pipeline import Download
+# Only what the server needs to start is imported here, the pipeline modules and pandas are imported by the first request using them
+from src.pipeline.result_cache import ResultCache
+from src.pipeline.job_queue import JobQueue, QueueFullError
+from src.metrics import registry, trace_id_var, new_trace_id
 
 app = Flask(__name__)
 CORS(app)
@@ -13,11 +18,224 @@ CORS(app)
 # Allowed file extensions for upload
 ALLOWED_EXTENSIONS = {'csv'}
 
+# Path of the uploaded dataset
+DATASET_PATH = os.path.join('notebook', 'data', 'StudentDataset.csv')
+
+# 'memory' keeps the whole upload in memory, 'chunked' streams it into per-cohort partitions
+INGESTION_MODE = os.environ.get("INGESTION_MODE", "memory")
+
+# Published results loaded by this process per (dataset hash, grade cohort, clustering backend, version), least recently used evicted first
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_ENTRIES", 32)),
+    max_bytes=int(os.environ.get("RESULT_CACHE_BYTES", 256 * 1024 * 1024)),
+)
+
+# All-cohorts results assembled from the cohorts above, per (dataset hash, '*', clustering backend, cohort versions)
+batch_cache = ResultCache(max_entries=4)
+
+# Background pipeline runs; submissions for a cohort already being analysed join the running job
+# Job records are saved under JOB_STATE_PATH, so every server process answers for every job
+job_queue = JobQueue(
+    max_workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("JOB_QUEUE_DEPTH", 16)),
+    state_path=os.environ.get("JOB_STATE_PATH", os.path.join('artifacts', 'jobs', 'state')),
+    record_ttl=int(os.environ.get("JOB_RECORD_TTL", 86400)),
+)
+
+# Write each run's stage artifacts under artifacts/jobs/<run id>/
+PERSIST_JOB_ARTIFACTS = os.environ.get("PERSIST_JOB_ARTIFACTS", "0") == "1"
+
+# Worker processes analysing the subjects of one run in parallel, 1 analyses them in the job thread
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", 1))
+
+# Start the worker processes in the background while the server comes up, so the first parallel run does not wait for them
+# Workers started with spawn or forkserver import this module again, only the server process starts the pool
+if PIPELINE_WORKERS > 1 and os.environ.get("PREWARM_WORKERS", "1") == "1" and multiprocessing.parent_process() is None:
+    from src.components.parallel import prewarm_process_pool
+    threading.Thread(target=prewarm_process_pool, args=(PIPELINE_WORKERS,), daemon=True).start()
+
+# Result store and exporter, created by the first request that needs them
+_result_store = None
+_exporter = None
+_services_lock = threading.Lock()
+
+# Function returning the results of every cohort, published once per (dataset hash, grade cohort, clustering backend) and shared by every server process
+def get_result_store():
+    global _result_store
+    with _services_lock:
+        if _result_store is None:
+            from src.components.result_store import ResultStore  # Import only when a result is published or read
+            _result_store = ResultStore(os.environ.get("RESULT_STORE_PATH"))
+        return _result_store
+
+# Function returning the exports of pipeline results, written once per result version, columns and cohort
+def get_exporter():
+    global _exporter
+    with _services_lock:
+        if _exporter is None:
+            from src.pipeline.download_pipeline import Download  # Import only when a result is downloaded
+            _exporter = Download()
+        return _exporter
+
+# Function returning the dataset uploaded last, in the configured ingestion mode
+def get_dataset():
+    if INGESTION_MODE == 'chunked':
+        from src.components.chunked_ingestion import load_partitioned_dataset  # Import only when the chunked mode is used
+        return load_partitioned_dataset()
+    from src.components.dataset_store import load_dataset  # Import only when a dataset is read
+    return load_dataset(DATASET_PATH)
+
+# Function building the cache key of an enrollment number for the current dataset
+def result_key(dataset, enr, cluster_method=None):
+    return (dataset.fingerprint, dataset.grade_of(enr), cluster_method)
+
+# Function returning what a job's result is: where its cohorts are published and the version of each
+def result_reference(dataset, cluster_method, versions, all_cohorts=False):
+    return {'fingerprint': dataset.fingerprint, 'cluster_method': cluster_method, 'cohorts': versions, 'all': all_cohorts}
+
+# Function publishing a cohort's result to the shared store, this process keeps the result it already has in memory
+def publish_result(key, result):
+    version = get_result_store().publish(key, result.final_data)
+    result_cache.put((*key, version), result)
+    return version
+
+# Function returning the reference of a result another run already published, None when a cohort still has to be computed
+def published_reference(dataset, grades, cluster_method, all_cohorts=False):
+    versions = {}
+    for grade in grades:
+        version = get_result_store().current_version((dataset.fingerprint, grade, cluster_method))
+        if version is None:
+            return None
+        versions[grade] = version
+    return result_reference(dataset, cluster_method, versions, all_cohorts)
+
+# Function running the pipeline for one enrollment in its own artifact directory and publishing the cohort's result
+def run_pipeline(dataset, enr, cluster_method):
+    from src.pipeline.train_pipeline import TrainPipeline  # Import only when the pipeline runs
+    artifacts_dir = os.path.join('artifacts', 'jobs', uuid.uuid4().hex)
+    result = TrainPipeline(persist=PERSIST_JOB_ARTIFACTS, cluster_method=cluster_method, artifacts_dir=artifacts_dir, n_jobs=PIPELINE_WORKERS).run(enr, dataset=dataset)
+    key = result_key(dataset, enr, cluster_method)
+    return result_reference(dataset, cluster_method, {key[1]: publish_result(key, result)})
+
+# Function running the pipeline for every cohort at once, publishing each cohort's result for later single submissions
+def run_all_pipelines(dataset, cluster_method):
+    from src.pipeline.train_pipeline import TrainPipeline  # Import only when the pipeline runs
+    artifacts_dir = os.path.join('artifacts', 'jobs', uuid.uuid4().hex)
+    batch = TrainPipeline(persist=PERSIST_JOB_ARTIFACTS, cluster_method=cluster_method, artifacts_dir=artifacts_dir).run_all(dataset=dataset)
+    versions = {grade: publish_result((dataset.fingerprint, grade, cluster_method), result) for grade, result in batch.results.items()}
+    return result_reference(dataset, cluster_method, versions, all_cohorts=True)
+
+# Function returning a cohort's published result, read from the store the first time this process serves the version
+def load_cohort(key, version):
+    def load():
+        from src.pipeline.train_pipeline import PipelineResult  # Import only when a result is rebuilt from the store
+        final_data, _ = get_result_store().read(key, version)
+        return PipelineResult.from_final_data(final_data, version=version)
+    return result_cache.get_or_compute((*key, version), load)
+
+# Function returning the result of a finished job, whichever process ran it
+def published_result(reference):
+    fingerprint, cluster_method, cohorts = reference['fingerprint'], reference['cluster_method'], reference['cohorts']
+    if not reference['all']:
+        (grade, version), = cohorts.items()
+        return load_cohort((fingerprint, grade, cluster_method), version)
+    from src.pipeline.train_pipeline import BatchResult  # Import only when an all-cohorts result is served
+    return batch_cache.get_or_compute(
+        (fingerprint, '*', cluster_method, tuple(cohorts.items())),
+        lambda: BatchResult({grade: load_cohort((fingerprint, grade, cluster_method), version) for grade, version in cohorts.items()}),
+    )
+
+# Function returning the job named by the job_id query parameter and the response to send instead while it has no result
+def requested_job():
+    job_id = request.args.get('job_id')
+    if not job_id:
+        # Every client names its own job, another client's result is never returned in its place
+        return None, ({'error': 'Missing job_id, submit the enrollment number to /data first'}, 400)
+    job = job_queue.get(job_id)
+    return job, pending_response(job)
+
+# Function returning the /fetch_data response of a job's student, answered with 304 when the client already has it
+def student_response(job):
+    result, enr = published_result(job.result), job.enrollment
+    if hasattr(result, 'results'):
+        # An all-cohorts job answers for any student given by ?enrollment=
+        try:
+            enr = int(request.args.get('enrollment'))
+        except (TypeError, ValueError):
+            return {'error': 'Invalid enrollment number'}, 400
+        result = result.result_for(enr)
+
+    payload = result.read_model.get(enr) if result is not None else None
+    if payload is None:
+        return {'error': 'Unknown student'}, 404
+
+    etag, body = payload
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate, a new run of the cohort changes the tag
+    return response.make_conditional(request)
+
+# Function returning the result of a job's cohort and the student asked about, from ?enrollment= or ?grade= for all-cohorts jobs
+def cohort_result(job):
+    enr = request.args.get('enrollment', job.enrollment)
+    try:
+        enr = int(enr) if enr is not None else None
+    except ValueError:
+        return None, None
+    result = published_result(job.result)
+    if hasattr(result, 'results'):  # BatchResult, one result per cohort
+        grade = request.args.get('grade')
+        return (result.results.get(grade) if grade else result.result_for(enr)), enr
+    return result, enr
+
+# Function returning the response for a job that has no result yet, or None once it is done
+def pending_response(job):
+    if job is None:
+        return {'error': 'Unknown job'}, 404
+    if job.status == 'failed':
+        return job.to_dict(), 500
+    if job.status != 'done':
+        return job.to_dict(), 202
+    return None
+
 # Function to check if a file has an allowed extension
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Give every request a trace id, taken from the X-Trace-Id header when the client sends one
+@app.before_request
+def start_trace():
+    g.trace_token = trace_id_var.set(request.headers.get('X-Trace-Id') or new_trace_id())
+    g.request_started = time.perf_counter()
+
+# Record the request duration per route and return the trace id to the client
+@app.after_request
+def finish_trace(response):
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    registry.observe(
+        'http_request_seconds', time.perf_counter() - g.request_started,
+        {'route': rule, 'method': request.method, 'status': response.status_code},
+        help_text='Duration of HTTP requests',
+    )
+    response.headers['X-Trace-Id'] = trace_id_var.get()
+    return response
+
+@app.teardown_request
+def end_trace(exc=None):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        trace_id_var.reset(token)
+
+# Route exposing the stage and request metrics in the Prometheus text format
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    registry.set_gauge('result_cache_entries', len(result_cache), help_text='Pipeline results held in the cache')
+    registry.set_counter('result_cache_hits_total', result_cache.hits, help_text='Cache lookups that found a result')
+    registry.set_counter('result_cache_misses_total', result_cache.misses, help_text='Cache lookups that found no result')
+    registry.set_gauge('job_queue_pending', job_queue.pending, help_text='Pipeline runs queued or running')
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 # Route to handle file upload
 @app.route('/upload', methods=['POST'])
 @cross_origin()
@@ -32,54 +250,228 @@ def upload():
 
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        new_filename = 'StudentDataset.csv'
-        file.save(os.path.join('notebook/data', new_filename))
+        result_cache.clear()  # Results of the previous dataset are no longer served
+        batch_cache.clear()
+        if INGESTION_MODE == 'chunked':
+            # Stream the upload straight into cohort partitions without holding the whole file
+            from src.components.chunked_ingestion import ChunkedIngestion  # Import only when the chunked mode is used
+            ChunkedIngestion().initiate_chunked_ingestion(file.stream)
+        else:
+            new_filename = 'StudentDataset.csv'
+            # Saved under a temporary name and renamed, runs starting meanwhile read the old file or the whole new one
+            temp_path = os.path.join('notebook/data', f'{new_filename}.{uuid.uuid4().hex}.tmp')
+            file.save(temp_path)
+            os.replace(temp_path, os.path.join('notebook/data', new_filename))
+            get_dataset()  # Parse and index the new dataset once, at upload time
         
         return {'message': 'Uploaded successfully'}, 200
     else:
         return {'error': 'Invalid file type'}, 400
 
-# Route to receive enrollment number and trigger data processing pipeline
+# Route to receive enrollment number and submit a data processing job
 @app.route('/data', methods=['POST'])
 @cross_origin()
 def datapoint():
-    global enr
+    from src.components.clustering import CLUSTER_METHODS  # Import only when a job is submitted
+    from src.components.model_trainer import ModelTrainerConfig  # Import only when a job is submitted
+
     data = request.get_json()
     enr = data.get('enrollment')
-    if enr is not None:
-        call(["python", "src/components/data_ingestion.py", str(enr)])
-        call(["python", "src/components/data_preparation.py"])
-        call(["python", "src/components/data_transformation.py"])
-        call(["python", "src/components/model_trainer.py"])
-        return {'message': 'Received successfully'}, 200
-    else:
+    # A missing backend is the default one, so both requests share one job key and one stored result
+    cluster_method = data.get('cluster_method')
+    if cluster_method is None:
+        cluster_method = ModelTrainerConfig.cluster_method
+    if not isinstance(cluster_method, str) or cluster_method not in CLUSTER_METHODS:
+        return {'error': 'Unknown cluster_method'}, 400
+
+    # {"all": true} analyses every cohort in one run, students are then fetched with ?enrollment=
+    if data.get('all'):
+        dataset = get_dataset()
+        key = (dataset.fingerprint, '*', cluster_method)
+        try:
+            job = job_queue.submit(
+                key, None, lambda: run_all_pipelines(dataset, cluster_method),
+                cached=published_reference(dataset, dataset.grades, cluster_method, all_cohorts=True),
+            )
+        except QueueFullError as e:
+            return {'error': str(e)}, 429
+        return {'message': 'Received successfully', **job.to_dict()}, 202
+
+    try:
+        enr = int(enr)
+        dataset = get_dataset()
+        key = result_key(dataset, enr, cluster_method)
+    except (TypeError, ValueError, KeyError, IndexError):
         return {'error': 'Invalid enrollment number'}, 400
 
-# Route to fetch processed data based on enrollment number
-@app.route('/fetch_data', methods=['GET'])
+    try:
+        # Reuse the result any server process published for this cohort, or run every stage on a background worker
+        job = job_queue.submit(
+            key, enr, lambda: run_pipeline(dataset, enr, cluster_method),
+            cached=published_reference(dataset, [key[1]], cluster_method),
+        )
+    except QueueFullError as e:
+        return {'error': str(e)}, 429
+
+    return {'message': 'Received successfully', **job.to_dict()}, 202
+
+# Route to report the status of a job
+@app.route('/jobs/<job_id>', methods=['GET'])
 @cross_origin()
-def fetchdata():
-    df, feature_, feature, clusters_, clusters_math, clusters_science, clusters_english = FetchData.fetch()
-    
-    # Filter data based on enrollment number
-    data = df[df["Id"] == float(enr)].to_dict(orient="list")
-    for i in feature:
-        data[i] = feature[i]
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return {'error': 'Unknown job'}, 404
+    return job.to_dict(), 200
 
-    data["feature_"] = feature_
-    data["clusters_"] = clusters_.to_dict(orient="list")
-    data["clusters_math"] = clusters_math.to_dict(orient="list")
-    data["clusters_science"] = clusters_science.to_dict(orient="list")
-    data["clusters_english"] = clusters_english.to_dict(orient="list")
+# Route to fetch the processed data of a job
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+@cross_origin()
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    return pending_response(job) or student_response(job)
 
-    return jsonify(data)
+# Route to fetch processed data of the job given by ?job_id=
+@app.route('/fetch_data', methods=['GET'])
+@cross_origin()
+def fetchdata():
+    job, pending = requested_job()
+    return pending or student_response(job)
 
-# Route to download processed data
+# Route to download processed data of the job given by ?job_id=, in the requested format
 @app.route('/download_data', methods=['GET'])
 @cross_origin()
 def download():
-    Download.download_data()
-    return send_file("artifacts/final_data.xlsx", as_attachment=True)
+    job, pending = requested_job()
+    if pending:
+        return pending
+
+    from src.pipeline.download_pipeline import EXPORT_FORMATS  # Import only when a result is downloaded
+
+    # ?format=xlsx|csv|parquet, ?columns=a,b,c and ?grade= select what is exported
+    file_format = request.args.get('format', 'xlsx')
+    columns = [column for column in request.args.get('columns', '').split(',') if column] or None
+    grade = request.args.get('grade')
+    result, exporter = published_result(job.result), get_exporter()
+    exporter.hold(result.version)  # The version's exports are not pruned until send_file has opened the file
+    try:
+        output_path = exporter.export(result, file_format, columns=columns, grade=grade)
+        # send_file opens the cached export and streams it in blocks instead of reading it into memory, relative paths would be resolved against the app's folder
+        return send_file(
+            os.path.abspath(output_path), as_attachment=True, download_name=f'final_data.{file_format}',
+            mimetype=EXPORT_FORMATS[file_format][1],
+        )
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    finally:
+        exporter.release(result.version)
+
+# Function returning the comma-separated values of a query parameter
+def list_arg(name):
+    return tuple(value for value in request.args.get(name, '').split(',') if value)
+
+# Route streaming the students of a job's result, filtered and paginated, as NDJSON or an Arrow IPC stream
+@app.route('/results', methods=['GET'])
+@cross_origin(expose_headers=['X-Next-Cursor'])
+def results():
+    job, pending = requested_job()
+    if pending:
+        return pending
+
+    from src.pipeline.result_query import ResultQuery, RESULT_FORMATS  # Import only when results are streamed
+
+    # ?grade=, ?performance= and ?status= take comma-separated values, ?subject= picks the labels they are matched on
+    file_format = request.args.get('format', 'ndjson')
+    try:
+        limit = request.args.get('limit')
+        query = ResultQuery(
+            grades=list_arg('grade'), performance=list_arg('performance'), status=list_arg('status'),
+            subject=request.args.get('subject', 'overall'), columns=list_arg('columns'),
+            limit=int(limit) if limit else None, cursor=request.args.get('cursor'),
+        )
+        chunks, next_cursor = query.stream(published_result(job.result), file_format)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    # Rows are encoded chunk by chunk while the response is sent, the next page starts at X-Next-Cursor
+    response = Response(chunks, mimetype=RESULT_FORMATS[file_format])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+# Route answering where a student stands in the cohort: percentile and rank per subject, performance and trend
+@app.route('/rank', methods=['GET'])
+@cross_origin()
+def rank():
+    job, pending = requested_job()
+    if pending:
+        return pending
+
+    result, enr = cohort_result(job)
+    if enr is None:
+        return {'error': 'Invalid enrollment number'}, 400
+    if result is None or enr not in result.rank_index.positions:
+        return {'error': 'Unknown student'}, 404
+
+    # ?subject= and ?metric= ask for one standing, without them every subject and metric is returned
+    subject, metric = request.args.get('subject'), request.args.get('metric')
+    try:
+        if subject or metric:
+            return {'Id': enr, subject or 'overall': {metric or 'performance': result.rank_index.percentile(enr, subject or 'overall', metric or 'performance')}}, 200
+        return {'Id': enr, **result.rank_index.standings(enr)}, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+# Route returning the k best or worst students of the cohort, ?order=bottom for the lowest ones
+@app.route('/rank/top', methods=['GET'])
+@cross_origin()
+def rank_top():
+    job, pending = requested_job()
+    if pending:
+        return pending
+
+    result, _ = cohort_result(job)
+    if result is None:
+        return {'error': 'Unknown grade'}, 404
+    try:
+        k = int(request.args.get('k', 10))
+        students = result.rank_index.top(
+            k, request.args.get('subject', 'overall'), request.args.get('metric', 'performance'),
+            bottom=request.args.get('order') == 'bottom',
+        )
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    return {'students': students}, 200
+
+# Route classifying new students against the cohort of the job given by ?job_id=, without clustering again
+@app.route('/predict', methods=['POST'])
+@cross_origin()
+def predict():
+    job, pending = requested_job()
+    if pending:
+        return pending
+
+    # {"students": [{term column: score, ...}, ...]} or {"student": {...}}, ?grade= picks the cohort of an all-cohorts job
+    data = request.get_json(silent=True) or {}
+    students = data.get('students') or ([data['student']] if isinstance(data.get('student'), dict) else None)
+    if not students:
+        return {'error': 'No students given'}, 400
+
+    result = published_result(job.result)
+    if hasattr(result, 'results'):  # BatchResult, one result per cohort
+        result = result.results.get(request.args.get('grade') or data.get('grade'))
+        if result is None:
+            return {'error': 'Unknown grade'}, 400
+
+    from src.pipeline.predict_pipeline import PredictPipeline  # Import only when new students are classified
+    try:
+        pipeline = PredictPipeline(result.performance_model)
+        predictions = pipeline.predict(students)
+        drift = pipeline.check_drift(students)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    return {'predictions': predictions.astype(object).where(predictions.notna(), None).to_dict(orient='records'), 'drift': drift}, 200
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
@@ -0,0 +1,91 @@
+import os  # Import os for operating system dependent functionality
+import argparse  # Import argparse for the command-line entry point
+
+import numpy as np  # Import numpy for random values
+import pandas as pd  # Import pandas for the generated dataset
+
+# Columns of StudentDataset.csv before the score columns, with their spelling in the uploaded file
+PROFILE_COLUMNS = {
+    'Gender': ['Male', 'Female'],
+    'Age as of Academic Year 17/18': list(range(3, 18)),
+    'Proposed Year/Grade (18/19)': None,  # Follows the current grade
+    'Year of Admission ': ['School 1 Current Student', 'New Admission 18/19', 'School 2 Current Student '],
+    'Previous Curriculum (17/18)2': ['American ', 'British', 'UAE', 'American', 'Indian', 'British ', 'CBSE'],
+    'Current School ': ['School 1', 'School 2'],
+    'Current Curriculum ': ['American ', 'British'],
+    'Previous year/Grade ': ['Grade System', 'Year System', 'Grade system', 'Year System '],
+}
+
+SUBJECTS = ('Math', 'Science', 'English')
+
+# Function returning the name of the i-th grade cohort, KG1, KG2, Grade 1, Grade 2 ...
+def grade_name(i):
+    return f'KG{i + 1}' if i < 2 else f'Grade {i - 1}'
+
+# Function returning the score column names of the file for n_terms terms after the entrance exam
+def score_columns(n_terms):
+    # Only 'Math-exam' lacks the trailing " '" the other score columns carry in the uploaded file
+    columns = ['Math-exam', "Science-exam '", "English-exam '"]
+    for term in range(n_terms):
+        year, part = 19 + term // 3, term % 3 + 1
+        columns += [f"{subject}{year}-{part} '" for subject in SUBJECTS]
+    return columns
+
+# Function generating a dataset in the StudentDataset.csv schema
+def generate_dataset(n_students=1549, n_grades=38, n_terms=6, missing_rate=0.0, garbage_rate=0.001, seed=0):
+    """
+    n_students: rows of the dataset
+    n_grades: grade cohorts the students are spread over
+    n_terms: terms after the entrance exam, three score columns each
+    missing_rate: share of empty score cells
+    garbage_rate: share of '#VALUE!' cells in the exam columns, which DataPreparation coerces to missing
+    """
+    rng = np.random.default_rng(seed)
+    grades = rng.integers(0, n_grades, n_students)
+
+    df = pd.DataFrame({'Gender': rng.choice(PROFILE_COLUMNS['Gender'], n_students)})
+    df['Age as of Academic Year 17/18'] = np.clip(grades + 3, 3, 17)
+    df['Current Year (17/18)'] = [grade_name(i) for i in grades]
+    df['Proposed Year/Grade (18/19)'] = [grade_name(i + 1) for i in grades]
+    for column in list(PROFILE_COLUMNS)[3:]:
+        df[column] = rng.choice(PROFILE_COLUMNS[column], n_students)
+
+    # Every student has an ability and a per-term drift, so trends and clusters are not pure noise
+    columns = score_columns(n_terms)
+    ability = rng.normal(75, 10, (n_students, 1))
+    drift = rng.normal(0, 1.5, (n_students, 1))
+    terms = np.repeat(np.arange(len(columns) // 3), 3)
+    scores = np.clip(np.rint(ability + drift * terms + rng.normal(0, 8, (n_students, len(columns)))), 0, 100)
+
+    # Cells are written as text, so empty and '#VALUE!' cells can sit next to the scores
+    cells = scores.astype(int).astype(str).astype(object)
+    cells[rng.random(cells.shape) < missing_rate] = ''
+    garbage = np.zeros(cells.shape, dtype=bool)
+    garbage[:, :3] = rng.random((n_students, 3)) < garbage_rate
+    cells[garbage] = '#VALUE!'
+
+    score_frame = pd.DataFrame(cells, columns=columns)
+    return pd.concat([df, score_frame], axis=1)
+
+# Function writing a generated dataset as CSV and returning its path
+def write_dataset(file_path, **kwargs):
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    generate_dataset(**kwargs).to_csv(file_path, index=False)
+    return file_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a dataset in the StudentDataset.csv schema")
+    parser.add_argument("output", help="Path of the CSV file to write")
+    parser.add_argument("--students", type=int, default=1549, help="Number of students")
+    parser.add_argument("--grades", type=int, default=38, help="Number of grade cohorts")
+    parser.add_argument("--terms", type=int, default=6, help="Number of terms after the entrance exam")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Share of empty score cells")
+    parser.add_argument("--garbage-rate", type=float, default=0.001, help="Share of '#VALUE!' cells in the exam columns")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    write_dataset(
+        args.output, n_students=args.students, n_grades=args.grades, n_terms=args.terms,
+        missing_rate=args.missing_rate, garbage_rate=args.garbage_rate, seed=args.seed,
+    )
+    print(f"Wrote {args.students} students to {args.output}")
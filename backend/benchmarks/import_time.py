@@ -0,0 +1,65 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import argparse  # Import argparse for the command-line entry point
+import subprocess  # Import subprocess to import every entry point in a fresh interpreter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Entry points are imported from backend/
+
+# Modules a server or CLI process imports before it can do any work
+ENTRY_POINTS = ['app', 'src.pipeline.train_pipeline', 'src.pipeline.predict_pipeline']
+
+# Function importing a module in a fresh interpreter, returning (cumulative seconds, self seconds) per imported module
+def import_times(module):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, 'PREWARM_WORKERS': '0'},  # Time the import alone, not the worker start
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr}")
+
+    # Lines read "import time: <self us> | <cumulative us> | <indented module name>"
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.setdefault(name.strip(), (int(cumulative_us) / 1e6, int(self_us) / 1e6))
+    return times
+
+# Function returning the best import time of a module over repeated fresh interpreters and the slowest imports of that run
+def measure(module, repeat=3, top=10):
+    best = None
+    for _ in range(repeat):
+        times = import_times(module)
+        if best is None or times[module][0] < best[module][0]:
+            best = times
+    # Top-level third-party and standard library packages, their cumulative time already includes their submodules
+    packages = {}
+    for name, (cumulative, _) in best.items():
+        root = name.split('.')[0]
+        packages[root] = max(packages.get(root, 0.0), cumulative)
+    slowest = sorted(((seconds, name) for name, seconds in packages.items() if name != module.split('.')[0]), reverse=True)[:top]
+    return best[module][0], slowest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the import time of every entry point in a fresh interpreter")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS, help="Modules to import, the server and CLI entry points by default")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module, the best one is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imported packages listed per module")
+    parser.add_argument("--budget", type=float, default=None, help="Seconds every entry point must import within")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        seconds, slowest = measure(module, args.repeat, args.top)
+        flag = "  OVER BUDGET" if args.budget is not None and seconds > args.budget else ""
+        if flag:
+            over_budget.append(module)
+        print(f"{module:<40} {seconds:9.4f}s{flag}")
+        for package_seconds, package in slowest:
+            print(f"    {package:<36} {package_seconds:9.4f}s")
+
+    if over_budget:
+        print(f"{len(over_budget)} entry points import slower than the {args.budget}s budget")
+        sys.exit(1)
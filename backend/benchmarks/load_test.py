@@ -0,0 +1,285 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json for request bodies, responses and the result file
+import time  # Import time for latencies and arrival times
+import uuid  # Import uuid for the multipart boundary
+import random  # Import random for arrivals and the traffic mix
+import socket  # Import socket to find a free port
+import argparse  # Import argparse for the command-line entry point
+import platform  # Import platform to describe the machine
+import tempfile  # Import tempfile for the server's working directory
+import threading  # Import threading to guard the shared statistics
+import subprocess  # Import subprocess to start the server under test
+import urllib.error  # Import urllib errors, non-2xx answers are results too
+import urllib.request  # Import urllib to send requests without third-party clients
+from concurrent.futures import ThreadPoolExecutor  # Import thread pool for concurrent teachers
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)  # Run from anywhere inside backend/
+
+from benchmarks.generate import generate_dataset  # Import the dataset generator
+
+# Function returning the q-th percentile of sorted values by nearest rank, None without values
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+# LoadStats class collecting the latency and status of every request and the correctness problems found
+class LoadStats:
+    def __init__(self):
+        self.latencies = {}  # Endpoint -> seconds of every request
+        self.statuses = {}  # Endpoint -> status code -> count
+        self.expected = {}  # Endpoint -> 4xx status codes that are the right answer, not errors
+        self.failures = []  # Correctness problems, each a dict describing what was expected and what came back
+        self.sessions = []  # Seconds from submitting a pipeline run to reading its student
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, status, seconds, expected=()):
+        with self._lock:
+            self.expected.setdefault(endpoint, set()).update(expected)
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            counts = self.statuses.setdefault(endpoint, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def session(self, seconds):
+        with self._lock:
+            self.sessions.append(seconds)
+
+    def fail(self, **problem):
+        with self._lock:
+            self.failures.append(problem)
+
+    # Method returning throughput, latency percentiles and error rate per endpoint
+    def report(self, duration):
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            # 202 is the answer of a job still running, every 4xx and 5xx the endpoint does not expect counts as an error
+            errors = sum(count for status, count in self.statuses[endpoint].items() if status >= 400 and status not in self.expected[endpoint])
+            endpoints[endpoint] = {
+                'requests': len(ordered),
+                'throughput': len(ordered) / duration if duration else None,
+                'p50_ms': 1000 * percentile(ordered, 50),
+                'p95_ms': 1000 * percentile(ordered, 95),
+                'p99_ms': 1000 * percentile(ordered, 99),
+                'error_rate': errors / len(ordered),
+                'statuses': {str(status): count for status, count in sorted(self.statuses[endpoint].items())},
+            }
+        sessions = sorted(self.sessions)
+        return {
+            'duration_seconds': duration,
+            'endpoints': endpoints,
+            'sessions': {
+                'completed': len(sessions),
+                'p50_ms': 1000 * percentile(sessions, 50) if sessions else None,
+                'p95_ms': 1000 * percentile(sessions, 95) if sessions else None,
+                'p99_ms': 1000 * percentile(sessions, 99) if sessions else None,
+            },
+            'correctness_failures': len(self.failures),
+            'failure_examples': self.failures[:10],
+        }
+
+# Client class sending one request at a time to the server and recording each of them
+class Client:
+    def __init__(self, base_url, stats, timeout=120):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+
+    # Method returning (status, headers, body) of a request, recorded under the endpoint's route
+    def request(self, endpoint, path, body=None, headers=None, method=None, expected=()):
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers or {}, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, response_headers, data = response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            status, response_headers, data = e.code, dict(e.headers), e.read()
+        except OSError:
+            status, response_headers, data = 599, {}, b''  # Connection refused, reset or timed out
+        self.stats.record(endpoint, status, time.perf_counter() - start, expected)
+        return status, response_headers, data
+
+    def post_json(self, endpoint, path, payload):
+        return self.request(endpoint, path, json.dumps(payload).encode('utf-8'), {'Content-Type': 'application/json'})
+
+    # Method uploading a CSV file as multipart form data, the way the dashboard's file input sends it
+    def upload(self, csv_bytes, filename='StudentDataset.csv'):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: text/csv\r\n\r\n'
+        ).encode('utf-8') + csv_bytes + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        return self.request('/upload', '/upload', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+# Function returning the Id and grade of every student of a generated dataset, the answers the server must give
+def expected_students(dataset):
+    return dict(enumerate(dataset['Current Year (17/18)'].tolist()))
+
+# Function running one teacher's visit: trigger a pipeline run, poll for the student, sometimes download the cohort
+def teacher_session(client, students, cohort_sizes, args, rng):
+    enr = rng.choice(list(students))
+    start = time.perf_counter()
+    status, _, body = client.post_json('/data', '/data', {'enrollment': enr})
+    if status != 202:
+        return
+    job_id = json.loads(body)['job_id']
+
+    # Poll like the dashboard does until the job is done
+    deadline = time.perf_counter() + args.job_timeout
+    while True:
+        status, _, body = client.request('/fetch_data', f'/fetch_data?job_id={job_id}')
+        if status != 202 or time.perf_counter() > deadline:
+            break
+        time.sleep(args.poll_interval)
+    if status != 200:
+        client.stats.fail(check='fetch_status', enrollment=enr, job_id=job_id, status=status)
+        return
+    client.stats.session(time.perf_counter() - start)
+
+    # Under concurrency the response must still be the requested student of the right cohort
+    data = json.loads(body)
+    if data.get('Id') != [enr] or data.get('Grade') != [students[enr]]:
+        client.stats.fail(check='fetch_student', enrollment=enr, job_id=job_id, expected_grade=students[enr], got_id=data.get('Id'), got_grade=data.get('Grade'))
+
+    if rng.random() < args.download_share:
+        status, _, body = client.request('/download_data', f'/download_data?job_id={job_id}&format=csv')
+        rows = body.count(b'\n') - 1  # Header line excluded
+        if status == 200 and rows != cohort_sizes[students[enr]]:
+            client.stats.fail(check='download_rows', enrollment=enr, job_id=job_id, expected_rows=cohort_sizes[students[enr]], got_rows=rows)
+
+    if rng.random() < args.unscoped_share:
+        # The request of a dashboard Download page that has no job of its own: whatever the server
+        # returns instead of refusing it is a cohort some other teacher submitted
+        status, _, body = client.request('/download_data (no job_id)', '/download_data', expected=(400,))
+        if status < 300:
+            client.stats.fail(check='unscoped_download', enrollment=enr, status=status, got_bytes=len(body))
+
+# Function returning a free local port
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# Function starting app.py in a temporary working directory holding the dataset, returning the process and its URL
+def start_server(work_dir, csv_bytes, env=None):
+    data_dir = os.path.join(work_dir, 'notebook', 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'StudentDataset.csv'), 'wb') as file_obj:
+        file_obj.write(csv_bytes)
+
+    port = free_port()
+    # The server runs in work_dir, so uploads, artifacts and logs never touch the repository
+    code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)"
+    process = subprocess.Popen(
+        [sys.executable, '-c', code], cwd=work_dir,
+        env={**os.environ, 'PYTHONPATH': BACKEND_DIR, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(base_url + '/metrics', timeout=1).read()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The server did not start within 60s")
+
+# Function driving the traffic mix for the configured duration, returning the report
+def run_load(base_url, csv_bytes, students, args):
+    stats = LoadStats()
+    client = Client(base_url, stats)
+    cohort_sizes = {}
+    for grade in students.values():
+        cohort_sizes[grade] = cohort_sizes.get(grade, 0) + 1
+
+    # Each arrival is a teacher visit or, for a share of them, a re-upload of the dataset
+    def visit(seed):
+        rng = random.Random(seed)
+        if rng.random() < args.upload_share:
+            client.upload(csv_bytes)
+        else:
+            teacher_session(client, students, cohort_sizes, args, rng)
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures, next_arrival, i = [], start, 0
+        while time.perf_counter() - start < args.duration:
+            if args.rate:
+                # Open loop: Poisson arrivals at the given rate, whether or not earlier visits have finished
+                next_arrival += rng.expovariate(args.rate)
+                time.sleep(max(0.0, next_arrival - time.perf_counter()))
+            else:
+                # Closed loop: a new visit as soon as one of the concurrent teachers is free
+                while sum(not future.done() for future in futures) >= args.concurrency:
+                    time.sleep(0.005)
+            futures.append(pool.submit(visit, rng.random()))
+            futures = [future for future in futures if not future.done()] if i % 100 == 99 else futures
+            i += 1
+        for future in futures:
+            future.result()
+    return stats.report(time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive mixed traffic against a local app.py and report latency, throughput and errors")
+    parser.add_argument("--url", default=None, help="Test a server that is already running instead of starting one; uploads replace its dataset")
+    parser.add_argument("--students", type=int, default=1549, help="Students in the generated dataset")
+    parser.add_argument("--grades", type=int, default=38, help="Grade cohorts in the generated dataset")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the dataset and the traffic")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds new visits are started for")
+    parser.add_argument("--concurrency", type=int, default=8, help="Teachers active at the same time")
+    parser.add_argument("--rate", type=float, default=None, help="Visits started per second, open loop; concurrency-bound closed loop when omitted")
+    parser.add_argument("--upload-share", type=float, default=0.02, help="Share of visits that upload the dataset again")
+    parser.add_argument("--download-share", type=float, default=0.2, help="Share of teacher visits that download their cohort")
+    parser.add_argument("--unscoped-share", type=float, default=0.1, help="Share of teacher visits that also download without a job_id, which must be refused")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Seconds between /fetch_data polls of a running job")
+    parser.add_argument("--job-timeout", type=float, default=120, help="Seconds a visit waits for its pipeline run")
+    parser.add_argument("--workers", type=int, default=1, help="PIPELINE_WORKERS of the started server")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate of any endpoint above which the run fails")
+    parser.add_argument("--output", default="load_test.json", help="Path of the JSON result file")
+    args = parser.parse_args()
+
+    dataset = generate_dataset(n_students=args.students, n_grades=args.grades, seed=args.seed)
+    csv_bytes = dataset.to_csv(index=False).encode('utf-8')
+    students = expected_students(dataset)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = None
+        if args.url:
+            base_url = args.url
+            Client(base_url, LoadStats()).upload(csv_bytes)  # The expected answers only hold for the generated dataset
+        else:
+            process, base_url = start_server(work_dir, csv_bytes, {'PIPELINE_WORKERS': str(args.workers)})
+        try:
+            report = run_load(base_url, csv_bytes, students, args)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    report['params'] = {key: value for key, value in vars(args).items() if key != 'output'}
+    report['machine'] = {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()}
+    with open(args.output, 'w') as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+    print(f"{'endpoint':<26} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for endpoint, row in report['endpoints'].items():
+        print(f"{endpoint:<26} {row['requests']:>9} {row['throughput']:8.2f} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} {row['error_rate']:8.2%}")
+    sessions = report['sessions']
+    if sessions['completed']:
+        print(f"{sessions['completed']} visits completed, submit to student p50 {sessions['p50_ms']:.0f}ms p95 {sessions['p95_ms']:.0f}ms p99 {sessions['p99_ms']:.0f}ms")
+    print(f"Wrote {args.output}")
+
+    failed = [endpoint for endpoint, row in report['endpoints'].items() if row['error_rate'] > args.max_error_rate]
+    if report['correctness_failures']:
+        print(f"{report['correctness_failures']} correctness problems, for example {report['failure_examples'][0]}")
+    if failed:
+        print(f"Error rate above {args.max_error_rate:.0%} on {', '.join(failed)}")
+    if report['correctness_failures'] or failed:
+        sys.exit(1)
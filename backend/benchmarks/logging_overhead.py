@@ -0,0 +1,67 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import time  # Import time for wall-clock measurements
+import logging  # Import logging to switch records off and to build the synchronous baseline
+import argparse  # Import argparse for the command-line entry point
+import tempfile  # Import tempfile for the generated dataset and the log files
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Run from anywhere inside backend/
+
+from benchmarks.generate import write_dataset  # Import the dataset generator
+from src.logger import JsonFormatter, LazyRotatingFileHandler, BackgroundQueueHandler  # Import the logging subsystem under test
+from src.components.dataset_store import StudentDataset  # Import the parsed, indexed dataset
+from src.pipeline.train_pipeline import TrainPipeline  # Import the pipeline whose logging is measured
+
+# Function returning the seconds the calling thread spends per record with a handler installed on a private logger
+def caller_seconds_per_record(handler, records):
+    logger = logging.getLogger('benchmarks.logging_overhead')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    try:
+        start = time.perf_counter()
+        for i in range(records):
+            logger.info("Stage %s finished", 'DataPreparation', extra={'rows': i, 'wall_seconds': 0.001})
+        return (time.perf_counter() - start) / records
+    finally:
+        logger.removeHandler(handler)
+
+# Function returning the best wall time of repeated pipeline runs
+def best_run(dataset, enr, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        TrainPipeline().run(enr, dataset=dataset)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cost of logging on the caller thread and on a pipeline run")
+    parser.add_argument("--records", type=int, default=20000, help="Records written per handler")
+    parser.add_argument("--students", type=int, default=200000, help="Students in the generated single-cohort dataset")
+    parser.add_argument("--repeat", type=int, default=3, help="Pipeline runs per measurement, the best one is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The same JSON records written on the calling thread, then handed to the background writer
+        synchronous = LazyRotatingFileHandler(os.path.join(work_dir, 'synchronous.log'))
+        synchronous.setFormatter(JsonFormatter())
+        queued_file = LazyRotatingFileHandler(os.path.join(work_dir, 'queued.log'))
+        queued_file.setFormatter(JsonFormatter())
+        queued = BackgroundQueueHandler(queued_file)
+
+        sync_seconds = caller_seconds_per_record(synchronous, args.records)
+        queue_seconds = caller_seconds_per_record(queued, args.records)
+        queued.stop()
+        synchronous.close()
+        queued_file.close()
+        print(f"caller thread per record  synchronous {sync_seconds * 1e6:8.2f}us  queued {queue_seconds * 1e6:8.2f}us")
+
+        dataset_path = write_dataset(os.path.join(work_dir, 'StudentDataset.csv'), n_students=args.students, n_grades=1)
+        dataset = StudentDataset.from_csv(dataset_path)
+        logged = best_run(dataset, 0, args.repeat)
+        logging.disable(logging.CRITICAL)
+        silent = best_run(dataset, 0, args.repeat)
+        logging.disable(logging.NOTSET)
+        print(f"pipeline {args.students:>8} students  logged {logged:7.3f}s  silent {silent:7.3f}s  "
+              f"overhead {100 * (logged - silent) / silent:6.2f}%")
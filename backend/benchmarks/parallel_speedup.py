@@ -0,0 +1,64 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import time  # Import time for wall-clock measurements
+import argparse  # Import argparse for the command-line entry point
+import tempfile  # Import tempfile for the generated dataset
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Run from anywhere inside backend/
+
+from benchmarks.generate import write_dataset  # Import the dataset generator
+from src.components.dataset_store import StudentDataset  # Import the in-memory dataset index
+from src.components.parallel import default_workers, get_process_pool, shutdown_process_pool  # Import the shared process pool
+from src.pipeline.train_pipeline import TrainPipeline  # Import the pipeline under test
+
+# Function building a generated dataset of n_students spread over n_grades cohorts
+def synthetic_dataset(n_students, n_grades, missing=0.02, seed=0):
+    with tempfile.TemporaryDirectory() as data_dir:
+        dataset_path = write_dataset(
+            os.path.join(data_dir, 'StudentDataset.csv'), n_students=n_students, n_grades=n_grades, missing_rate=missing, seed=seed,
+        )
+        return StudentDataset.from_csv(dataset_path)
+
+# Function returning the best wall time of repeated calls and the last result
+def timed(function, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# Function checking that two pipeline results hold the same data
+def same_result(left, right):
+    return left.final_data.equals(right.final_data)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the sequential and parallel pipeline on synthetic data")
+    parser.add_argument("--students", type=int, default=300000, help="Students in the single-cohort benchmark")
+    parser.add_argument("--cohort-students", type=int, default=400000, help="Students in the all-cohorts benchmark")
+    parser.add_argument("--grades", type=int, default=12, help="Cohorts in the all-cohorts benchmark")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Worker processes of the parallel mode")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best one is reported")
+    args = parser.parse_args()
+
+    pool = get_process_pool(args.workers)
+    for _ in range(args.workers):
+        pool.submit(int).result()  # Start every worker before measuring
+
+    # Per-subject fan-out inside one large cohort
+    dataset = synthetic_dataset(args.students, 1)
+    sequential, expected = timed(lambda: TrainPipeline(n_jobs=1).run(0, dataset=dataset), args.repeat)
+    parallel, actual = timed(lambda: TrainPipeline(n_jobs=args.workers).run(0, dataset=dataset), args.repeat)
+    print(f"subjects  {args.students:>8} students  sequential {sequential:7.2f}s  parallel {parallel:7.2f}s  "
+          f"speedup {sequential / parallel:5.2f}x  identical {same_result(expected, actual)}")
+
+    # Per-cohort fan-out over every grade
+    dataset = synthetic_dataset(args.cohort_students, args.grades)
+    enrollments = [int(rows[0]) for rows in dataset.grade_rows.values()]
+    sequential, expected = timed(lambda: TrainPipeline(n_jobs=1).run_many(enrollments, dataset=dataset), args.repeat)
+    parallel, actual = timed(lambda: TrainPipeline(n_jobs=args.workers).run_many(enrollments, dataset=dataset), args.repeat)
+    identical = all(same_result(expected[grade], actual[grade]) for grade in expected)
+    print(f"cohorts   {args.cohort_students:>8} students  sequential {sequential:7.2f}s  parallel {parallel:7.2f}s  "
+          f"speedup {sequential / parallel:5.2f}x  identical {identical}")
+
+    shutdown_process_pool()
@@ -0,0 +1,198 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json for the result files
+import time  # Import time for wall-clock measurements
+import argparse  # Import argparse for the command-line entry point
+import platform  # Import platform to describe the machine
+import tempfile  # Import tempfile for the generated dataset and artifacts
+import tracemalloc  # Import tracemalloc for peak memory per stage
+
+import pandas as pd  # Import pandas for data manipulation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Run from anywhere inside backend/
+
+from benchmarks.generate import write_dataset  # Import the dataset generator
+from src.components.dataset_store import StudentDataset  # Import the parsed, indexed dataset
+from src.components.data_ingestion import DataIngestion  # Import data ingestion stage
+from src.components.data_preparation import DataPreparation  # Import data preparation stage
+from src.components.data_transformation import DataTransformation  # Import data transformation stage
+from src.components.model_trainer import ModelTrainer  # Import model training stage
+from src.pipeline.train_pipeline import PipelineResult, relocate_artifacts  # Import the pipeline result
+from src.pipeline.predict_pipeline import FetchData  # Import the dashboard data stage
+from src.pipeline.download_pipeline import Download  # Import the Excel export stage
+
+# Function returning the stages of one pipeline run, in order, each a (name, function) pair
+def pipeline_stages(dataset_path, enr, artifacts_dir, persist):
+    state = {}
+
+    def configured(stage, config_name):
+        relocate_artifacts(getattr(stage, config_name), artifacts_dir)  # Keep benchmark artifacts out of artifacts/
+        return stage
+
+    def load():
+        state['dataset'] = StudentDataset.from_csv(dataset_path)
+        return len(state['dataset'])
+
+    def ingest():
+        stage = configured(DataIngestion(), 'ingestion_config')
+        state['raw_data'] = stage.initiate_data_ingestion(enr, persist=persist, dataset=state['dataset'])
+        return len(state['raw_data'])
+
+    def prepare():
+        stage = configured(DataPreparation(), 'data_preparation_config')
+        stage.initiate_data_preparation(state['raw_data'], persist=persist)
+        return len(state['raw_data'])
+
+    def transform():
+        stage = configured(DataTransformation(), 'data_transformation_config')
+        state['transformed'] = stage.get_data_transformer_object(state['raw_data'], persist=persist)
+        return len(state['transformed'][0])
+
+    def evaluate():
+        reshaped, feature_all, feature_math, feature_science, feature_english = state['transformed']
+        data = pd.DataFrame(reshaped, columns=feature_all)
+        state['evaluated'] = ModelTrainer().evaluate_model(data, feature_all, feature_math, feature_science, feature_english)
+        return len(data)
+
+    def train():
+        model_trainer = ModelTrainer()
+        x_data = state['evaluated']['Overall Performance'].values.reshape(-1, 1)
+        model_trainer.train_model(model_trainer.scale_data(x_data))
+        return len(x_data)
+
+    def train_full():
+        reshaped, feature_all, feature_math, feature_science, feature_english = state['transformed']
+        model_trainer = configured(ModelTrainer(), 'model_trainer_config')
+        final_data = model_trainer.initiate_model_training(
+            reshaped, feature_all, feature_math, feature_science, feature_english,
+            raw_data=state['raw_data'], persist=persist,
+        )
+        state['trends'] = model_trainer.trends
+        state['final_data'] = final_data
+        return len(final_data)
+
+    def result():
+        _, _, feature_math, feature_science, feature_english = state['transformed']
+        state['result'] = PipelineResult(
+            final_data=state['final_data'],
+            transformation={'feature_math': feature_math, 'feature_science': feature_science, 'feature_english': feature_english},
+            trends=state['trends'],
+        )  # Builds the read model and the result version
+        return len(state['final_data'])
+
+    def fetch():
+        FetchData.fetch(state['result'])
+        return len(state['final_data'])
+
+    def download():
+        Download.download_data(state['final_data'], os.path.join(artifacts_dir, 'final_data.xlsx'))
+        return len(state['final_data'])
+
+    return [
+        ('load_dataset', load),
+        ('DataIngestion', ingest),
+        ('DataPreparation', prepare),
+        ('DataTransformation', transform),
+        ('ModelTrainer.evaluate_model', evaluate),
+        ('ModelTrainer.train_model', train),
+        ('ModelTrainer.initiate_model_training', train_full),
+        ('PipelineResult', result),
+        ('FetchData.fetch', fetch),
+        ('Download.download_data', download),
+    ]
+
+# Function running every stage repeat times, returning the best and mean wall time, rows and peak memory per stage
+def run_benchmark(dataset_path, enr=0, repeat=3, persist=False, memory=True):
+    with tempfile.TemporaryDirectory() as artifacts_dir:
+        timings = {}
+        for _ in range(repeat):
+            for name, stage in pipeline_stages(dataset_path, enr, artifacts_dir, persist):
+                start = time.perf_counter()
+                rows = stage()
+                timings.setdefault(name, {'rows': rows, 'runs': []})['runs'].append(time.perf_counter() - start)
+
+        # Peak memory is measured in a separate run, tracing slows every allocation down
+        if memory:
+            for name, stage in pipeline_stages(dataset_path, enr, artifacts_dir, persist):
+                tracemalloc.start()
+                stage()
+                timings[name]['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+    return {
+        name: {
+            'seconds': min(stage['runs']),
+            'mean_seconds': sum(stage['runs']) / len(stage['runs']),
+            'rows': stage['rows'],
+            'peak_bytes': stage.get('peak_bytes'),
+        }
+        for name, stage in timings.items()
+    }
+
+# Function comparing stage timings against a baseline, returning the report lines and the regressed stages
+def compare(current, baseline, tolerance=0.2, min_seconds=0.005):
+    lines, regressions = [], []
+    for name, stage in current['stages'].items():
+        reference = baseline['stages'].get(name)
+        if reference is None:
+            lines.append(f"{name:<40} {stage['seconds']:9.4f}s  (not in baseline)")
+            continue
+        ratio = stage['seconds'] / reference['seconds'] if reference['seconds'] else float('inf')
+        # Stages faster than min_seconds are too noisy to flag
+        regressed = ratio > 1 + tolerance and stage['seconds'] >= min_seconds
+        if regressed:
+            regressions.append(name)
+        lines.append(
+            f"{name:<40} {reference['seconds']:9.4f}s -> {stage['seconds']:9.4f}s  x{ratio:5.2f}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return lines, regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on a generated dataset")
+    parser.add_argument("--students", type=int, default=50000, help="Number of generated students")
+    parser.add_argument("--grades", type=int, default=4, help="Number of grade cohorts")
+    parser.add_argument("--terms", type=int, default=6, help="Number of terms after the entrance exam")
+    parser.add_argument("--missing-rate", type=float, default=0.01, help="Share of empty score cells")
+    parser.add_argument("--garbage-rate", type=float, default=0.001, help="Share of '#VALUE!' cells in the exam columns")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generated dataset")
+    parser.add_argument("--dataset", default=None, help="Benchmark an existing CSV file instead of a generated one")
+    parser.add_argument("--enrollment", type=int, default=0, help="Enrollment number whose cohort is analysed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage, the best one is reported")
+    parser.add_argument("--persist", action="store_true", help="Also write the stage artifacts, to a temporary directory")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory run")
+    parser.add_argument("--output", default="benchmark.json", help="Path of the JSON result file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    params = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'tolerance')}
+    with tempfile.TemporaryDirectory() as data_dir:
+        dataset_path = args.dataset or write_dataset(
+            os.path.join(data_dir, 'StudentDataset.csv'), n_students=args.students, n_grades=args.grades,
+            n_terms=args.terms, missing_rate=args.missing_rate, garbage_rate=args.garbage_rate, seed=args.seed,
+        )
+        stages = run_benchmark(dataset_path, args.enrollment, args.repeat, args.persist, not args.no_memory)
+
+    report = {
+        'params': params,
+        'machine': {'python': platform.python_version(), 'pandas': pd.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'stages': stages,
+    }
+    with open(args.output, 'w') as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+    for name, stage in stages.items():
+        peak = f"{stage['peak_bytes'] / 2 ** 20:9.1f} MiB" if stage['peak_bytes'] is not None else ""
+        print(f"{name:<40} {stage['seconds']:9.4f}s  {stage['rows']:>9} rows  {peak}")
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file_obj:
+            baseline = json.load(file_obj)
+        lines, regressions = compare(report, baseline, args.tolerance)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} stages slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
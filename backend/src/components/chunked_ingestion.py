@@ -0,0 +1,313 @@
+import io  # Import io to decode the header line
+import os  # Import os for operating system dependent functionality
+import csv  # Import csv to split the header line
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json for the partition manifest
+import time  # Import time for throughput reporting
+import shutil  # Import shutil to remove staged and old partition versions
+import hashlib  # Import hashlib for the content hash of the stream
+import threading  # Import threading to guard the loaded partitions
+from collections import Counter  # Import Counter for incremental value counts
+from dataclasses import dataclass  # Import dataclass for configuration handling
+
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.components.schema import GRADE_COLUMN, clean_column, compile_schema  # Import the compiled schema of the uploaded header
+
+# ChunkedIngestionConfig dataclass to hold configuration options
+@dataclass
+class ChunkedIngestionConfig:
+    partitions_dir: str = os.path.join('artifacts', 'partitions')  # Directory of the ingested versions and the CURRENT pointer
+    chunk_size: int = int(os.environ.get('INGESTION_CHUNK_SIZE', 100000))  # Rows parsed per chunk, bounds peak memory
+    keep_versions: int = 3  # Ingested versions kept on disk, runs still reading an older one can finish
+
+# Name of the file holding the ingested version readers are served
+CURRENT_FILE = 'CURRENT'
+
+# Function returning the directory of the current version of a partitions directory, itself when it holds one version directly
+def current_partitions(directory):
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as file_obj:
+            return os.path.join(directory, file_obj.read().strip())
+    except FileNotFoundError:
+        return directory  # Written by hand or before versions were kept, the files are in the directory itself
+
+# _HashingReader wraps a binary stream and hashes every byte pandas reads from it
+class _HashingReader:
+    def __init__(self, stream):
+        self.stream = stream
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.digest.update(data)
+        return data
+
+    def readline(self, size=-1):
+        line = self.stream.readline(size)
+        self.digest.update(line)
+        return line
+
+    def __iter__(self):
+        return iter(self.read, b"")
+
+# Function returning the exact median from merged value counts
+def _median_from_counts(counts):
+    if not counts:
+        return np.nan
+    values = np.array(sorted(counts))
+    cumulative = np.cumsum([counts[value] for value in values])
+    total = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (total + 1) // 2)]
+    upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return float((lower + upper) / 2)
+
+# PartitionedDataset class, a dataset stored as one Parquet file per grade cohort
+class PartitionedDataset:
+    def __init__(self, directory, manifest, grade_codes, cohort_offsets):
+        self.directory = directory  # Directory holding the partitions
+        self.manifest = manifest  # Cohort files, row counts and statistics
+        self.fingerprint = manifest['fingerprint']  # Content hash of the ingested stream
+        self.grades = [cohort['grade'] for cohort in manifest['cohorts']]  # Grade of every cohort code
+        self.files = {cohort['grade']: cohort['file'] for cohort in manifest['cohorts']}
+        self.grade_codes = grade_codes  # Cohort code per row, -1 when the grade is missing
+        self.cohort_offsets = cohort_offsets  # Position of every row inside its own cohort
+
+    # Method to open the current partitions written by an earlier ingestion
+    @classmethod
+    def load(cls, directory=None):
+        try:
+            directory = current_partitions(directory or ChunkedIngestionConfig().partitions_dir)
+            with open(os.path.join(directory, 'manifest.json')) as file_obj:
+                manifest = json.load(file_obj)
+            grade_codes = np.load(os.path.join(directory, 'grade_codes.npy'), mmap_mode='r')
+            cohort_offsets = np.load(os.path.join(directory, 'cohort_offsets.npy'), mmap_mode='r')
+            return cls(directory, manifest, grade_codes, cohort_offsets)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method returning the grade cohort of an enrollment number
+    def grade_of(self, enr):
+        if enr < 0 or enr >= len(self.grade_codes):
+            raise KeyError(enr)  # Same as the in-memory dataset, negative numbers must not count from the end
+        code = int(self.grade_codes[enr])
+        return self.grades[code] if code >= 0 else np.nan
+
+    # Method reading one cohort partition
+    def cohort(self, grade):
+        if grade not in self.files:
+            return pd.DataFrame(columns=self.manifest['columns'])
+        return pd.read_parquet(os.path.join(self.directory, self.files[grade]))
+
+    # Method returning the grade of a student and its row position inside that cohort, Ids being row numbers
+    def locate(self, student_id):
+        return self.grade_of(student_id), int(self.cohort_offsets[student_id])
+
+    # Method returning the statistics gathered for one cohort during ingestion
+    def statistics(self, grade):
+        return next(cohort for cohort in self.manifest['cohorts'] if cohort['grade'] == grade)
+
+    def __len__(self):
+        return self.manifest['rows']
+
+# ChunkedIngestion class streaming a CSV into per-cohort partitions in a single pass
+class ChunkedIngestion:
+    def __init__(self, chunk_size=None):
+        self.chunked_ingestion_config = ChunkedIngestionConfig()  # Initialize with default configuration
+        if chunk_size is not None:
+            self.chunked_ingestion_config.chunk_size = chunk_size
+
+    # Method to stream a file path or binary stream into cohort partitions
+    def initiate_chunked_ingestion(self, source, progress=None):
+        logging.info("Entered the Chunked Data Ingestion Method")  # Log entry into method
+        config = self.chunked_ingestion_config
+        # Every ingestion writes a new version directory, time ordered, readers of the previous one are never disturbed
+        version = f"{time.time_ns()}-{os.getpid()}"
+        staging_dir = os.path.join(config.partitions_dir, version + '.tmp')
+        writers = {}  # Grade -> open ParquetWriter
+
+        try:
+            import pyarrow as pa  # Imported lazily, only the chunked mode writes Parquet incrementally
+            import pyarrow.parquet as pq
+
+            opened = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else None
+            reader = _HashingReader(opened or source)
+
+            os.makedirs(staging_dir)
+
+            schema = None  # Arrow schema shared by every partition
+            codes = {}  # Grade -> cohort code, in order of first appearance
+            cohorts = []  # Per-cohort statistics
+            row_codes = []  # Cohort code of every row, one array per chunk
+            row_offsets = []  # Position inside the cohort of every row, one array per chunk
+            seen = np.zeros(0, dtype=np.int64)  # Rows seen so far per cohort code
+            rows = 0
+            started = time.perf_counter()
+
+            # Compile the schema from the header line, then parse only the grade and score columns of the rows
+            header = next(csv.reader(io.StringIO(reader.readline().decode('utf-8-sig'))), [])
+            dataset_schema = compile_schema(header)
+            raw_used = dataset_schema.raw_used_columns()
+            columns = [clean_column(column) for column in raw_used] + ['Id']
+            score_columns = list(dataset_schema.score_columns)
+            chunks = pd.read_csv(
+                reader, header=None, names=list(dataset_schema.raw_columns), usecols=raw_used,
+                dtype=dataset_schema.dtypes(float_scores=False),  # A later chunk may hold text in any score column
+                chunksize=config.chunk_size,
+            )
+
+            for chunk in chunks:
+                chunk['Id'] = np.arange(rows, rows + len(chunk))
+                chunk.columns = columns
+
+                # Coerce scores to float, counting exam cells that were not numbers
+                raw_exam = {column: chunk[column].notna() for column in score_columns if 'exam' in column}
+                chunk[score_columns] = chunk[score_columns].apply(pd.to_numeric, errors='coerce').astype(float)
+
+                # Text columns are stored as strings so every chunk shares one schema
+                for column in columns:
+                    if column not in score_columns and column != 'Id':
+                        chunk[column] = chunk[column].astype('string')
+
+                # Assign cohort codes and in-cohort offsets to every row of the chunk
+                grades = chunk[GRADE_COLUMN]
+                for grade in grades.dropna().unique():
+                    if grade not in codes:
+                        codes[grade] = len(codes)
+                        cohorts.append({'grade': grade, 'file': f'cohort-{codes[grade]:05d}.parquet', 'rows': 0,
+                                        'nulls': Counter(), 'coerced': Counter(), 'counts': {}})
+                chunk_codes = grades.map(codes).fillna(-1).astype(np.int64).to_numpy()
+                seen = np.concatenate((seen, np.zeros(len(codes) - len(seen), dtype=np.int64)))
+                within = pd.Series(chunk_codes).groupby(chunk_codes).cumcount().to_numpy()
+                row_offsets.append(np.where(chunk_codes >= 0, seen[np.maximum(chunk_codes, 0)] + within, -1))
+                row_codes.append(chunk_codes.astype(np.int32))
+                seen += np.bincount(chunk_codes[chunk_codes >= 0], minlength=len(codes))
+
+                # Append every cohort of the chunk to its partition
+                valid = chunk_codes >= 0
+                assigned = chunk[valid]
+                assigned_codes = chunk_codes[valid]
+                for code, part in assigned.groupby(assigned_codes, sort=False):
+                    cohort = cohorts[code]
+                    table = pa.Table.from_pandas(part, preserve_index=False)
+                    if schema is None:
+                        schema = table.schema
+                    if cohort['grade'] not in writers:
+                        writers[cohort['grade']] = pq.ParquetWriter(os.path.join(staging_dir, cohort['file']), schema)
+                    writers[cohort['grade']].write_table(table.cast(schema))
+                    cohort['rows'] += len(part)
+
+                # Merge null counts, coerced cells and value counts of the chunk, grouped by cohort in one pass each
+                missing = assigned[score_columns].isna()
+                for code, nulls in missing.groupby(assigned_codes).sum().iterrows():
+                    cohorts[code]['nulls'].update(nulls.to_dict())
+                if raw_exam:
+                    coerced = pd.DataFrame({column: present[valid].to_numpy() for column, present in raw_exam.items()}) & missing[list(raw_exam)].to_numpy()
+                    for code, counts in coerced.groupby(assigned_codes).sum().iterrows():
+                        cohorts[code]['coerced'].update(counts.to_dict())
+                for column in score_columns:
+                    pairs = pd.DataFrame({'code': assigned_codes, 'value': assigned[column].to_numpy()}).dropna()
+                    for (code, value), count in pairs.value_counts(sort=False).items():
+                        cohorts[code]['counts'].setdefault(column, Counter())[value] += count
+
+                rows += len(chunk)
+                elapsed = time.perf_counter() - started
+                rate = rows / elapsed if elapsed > 0 else float('inf')
+                logging.info(f"Ingested {rows} rows ({rate:,.0f} rows/sec)")  # Log progress of the stream
+                if progress is not None:
+                    progress(rows, rate)
+
+            for writer in writers.values():
+                writer.close()
+            writers.clear()
+            if opened is not None:
+                opened.close()
+
+            # Final statistics: null counts, coerced cells and exact medians from the merged value counts
+            for cohort in cohorts:
+                counts = cohort.pop('counts')
+                cohort['medians'] = {column: _median_from_counts(counts.get(column, {})) for column in score_columns}
+                cohort['nulls'] = dict(cohort['nulls'])
+                cohort['coerced'] = dict(cohort['coerced'])
+
+            manifest = {
+                'fingerprint': reader.digest.hexdigest(),
+                'rows': rows,
+                'columns': columns,
+                'chunk_size': config.chunk_size,
+                'cohorts': cohorts,
+            }
+            with open(os.path.join(staging_dir, 'manifest.json'), 'w') as file_obj:
+                json.dump(manifest, file_obj)
+            grade_codes = np.concatenate(row_codes) if row_codes else np.zeros(0, dtype=np.int32)
+            cohort_offsets = np.concatenate(row_offsets) if row_offsets else np.zeros(0, dtype=np.int64)
+            np.save(os.path.join(staging_dir, 'grade_codes.npy'), grade_codes)
+            np.save(os.path.join(staging_dir, 'cohort_offsets.npy'), cohort_offsets)
+
+            # Publish the version only once it is complete: rename it, then point CURRENT at it atomically
+            os.replace(staging_dir, os.path.join(config.partitions_dir, version))
+            pointer_path = os.path.join(config.partitions_dir, f"{CURRENT_FILE}.{version}.tmp")
+            with open(pointer_path, 'w') as file_obj:
+                file_obj.write(version)
+            os.replace(pointer_path, os.path.join(config.partitions_dir, CURRENT_FILE))
+            self._prune(keep=version)
+
+            elapsed = time.perf_counter() - started
+            logging.info(f"Chunked ingestion of {rows} rows into {len(cohorts)} cohorts completed in {elapsed:.2f}s")
+
+            dataset = PartitionedDataset.load(config.partitions_dir)
+            _register(dataset)
+            return dataset
+
+        except Exception as e:
+            for writer in writers.values():
+                writer.close()
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise CustomException(e, sys)
+
+    # Method removing the ingested versions older than the newest keep_versions, never the one just published
+    def _prune(self, keep):
+        config = self.chunked_ingestion_config
+        versions = sorted(
+            name for name in os.listdir(config.partitions_dir)
+            if name < keep and not name.endswith('.tmp') and os.path.isdir(os.path.join(config.partitions_dir, name))
+        )  # Staging directories belong to ingestions still running
+        for name in versions[:max(0, len(versions) + 1 - config.keep_versions)]:
+            shutil.rmtree(os.path.join(config.partitions_dir, name), ignore_errors=True)
+
+# Partitioned datasets opened so far, keyed by version directory
+_partitioned = {}
+_partitioned_lock = threading.Lock()
+
+def _register(dataset):
+    with _partitioned_lock:
+        for directory in [directory for directory in _partitioned if not os.path.isdir(directory)]:
+            del _partitioned[directory]  # Pruned versions are not opened again
+        _partitioned[os.path.abspath(dataset.directory)] = dataset
+
+# Function returning the current partitioned dataset of a directory, reopened whenever any process ingested a new version
+def load_partitioned_dataset(directory=None):
+    version_dir = os.path.abspath(current_partitions(directory or ChunkedIngestionConfig().partitions_dir))
+    with _partitioned_lock:
+        dataset = _partitioned.get(version_dir)
+    if dataset is None:
+        dataset = PartitionedDataset.load(version_dir)
+        _register(dataset)
+    return dataset
+
+# Entry point of the script
+if __name__ == "__main__":
+    import argparse  # Import argparse for the command-line entry point
+
+    parser = argparse.ArgumentParser(description="Stream a StudentDataset.csv into per-cohort partitions")
+    parser.add_argument("path", help="CSV file to ingest")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows parsed per chunk")
+    args = parser.parse_args()
+
+    dataset = ChunkedIngestion(chunk_size=args.chunk_size).initiate_chunked_ingestion(
+        args.path, progress=lambda rows, rate: print(f"{rows} rows, {rate:,.0f} rows/sec"),
+    )
+    print(f"Ingested {len(dataset)} rows into {len(dataset.grades)} cohorts")
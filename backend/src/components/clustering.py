@@ -0,0 +1,130 @@
+import numpy as np  # Import numpy for numerical operations
+from dataclasses import dataclass  # Import dataclass for the clustering result
+
+# Performance category of each cluster label, 0 being the highest cluster
+PERFORMANCE_LABELS = ('Strong', 'Moderate', 'Weak')
+
+# ClusterResult dataclass with labels ordered so that cluster 0 always has the highest mean
+@dataclass
+class ClusterResult:
+    labels_: np.ndarray  # Cluster label per value, 0 = highest cluster
+    centers_: np.ndarray  # Mean of each cluster, in label order (descending)
+    method: str  # Name of the backend that produced the clustering
+
+# Ward agglomerative clustering, the original O(n^2) backend
+def _ward_labels(values, n_clusters):
+    from sklearn.cluster import AgglomerativeClustering  # Imported lazily, only this backend needs it
+
+    cluster = AgglomerativeClustering(n_clusters=n_clusters, metric='euclidean', linkage='ward')
+    cluster.fit(values.reshape(-1, 1))
+    return cluster.labels_
+
+# Cost of putting sorted values i..j-1 into one cluster, from prefix sums
+def _segment_cost(prefix, prefix_sq, i, j):
+    size = j - i
+    total = prefix[j] - prefix[i]
+    return (prefix_sq[j] - prefix_sq[i]) - total * total / size
+
+# Exact optimal 1-D k-means (Fisher / Jenks natural breaks) by dynamic programming on sorted values
+def _optimal_labels(values, n_clusters):
+    """
+    Minimises the within-cluster sum of squares over contiguous segments of the
+    sorted values. Each DP layer is solved with the divide & conquer optimisation
+    (the optimal split point is monotone), processed one recursion level at a time
+    with numpy, so the whole fit is O(k n log n) time and O(k n) memory.
+    Jenks natural breaks optimise the same objective, so both names map here.
+    """
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    n = len(sorted_values)
+
+    prefix = np.concatenate(([0.0], np.cumsum(sorted_values)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(sorted_values * sorted_values)))
+
+    ends = np.arange(n + 1)
+    previous = np.full(n + 1, np.inf)
+    previous[1:] = _segment_cost(prefix, prefix_sq, 0, ends[1:])  # One cluster covering values 0..j-1
+    splits = []
+
+    for layer in range(2, n_clusters + 1):
+        current = np.full(n + 1, np.inf)
+        split = np.zeros(n + 1, dtype=np.int64)
+
+        # Pending ranges of end points [j_lo, j_hi] whose split lies in [opt_lo, opt_hi]
+        j_lo = np.array([layer]); j_hi = np.array([n])
+        opt_lo = np.array([layer - 1]); opt_hi = np.array([n - 1])
+
+        while len(j_lo):
+            mid = (j_lo + j_hi) // 2
+            upper = np.minimum(mid - 1, opt_hi)
+            counts = upper - opt_lo + 1
+
+            # Flatten every candidate split of every pending mid point into one array
+            group = np.repeat(np.arange(len(mid)), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            candidates = opt_lo[group] + offsets
+            costs = previous[candidates] + _segment_cost(prefix, prefix_sq, candidates, mid[group])
+
+            # First candidate reaching the minimum of its group
+            best = np.minimum.reduceat(costs, np.cumsum(counts) - counts)
+            hits = np.flatnonzero(costs == best[group])
+            _, first = np.unique(group[hits], return_index=True)
+            best_split = candidates[hits[first]]
+
+            current[mid] = best
+            split[mid] = best_split
+
+            # Left halves keep the lower split bound, right halves the upper one
+            next_lo = np.concatenate((j_lo, mid + 1))
+            next_hi = np.concatenate((mid - 1, j_hi))
+            next_opt_lo = np.concatenate((opt_lo, best_split))
+            next_opt_hi = np.concatenate((best_split, opt_hi))
+            keep = next_lo <= next_hi
+            j_lo, j_hi, opt_lo, opt_hi = next_lo[keep], next_hi[keep], next_opt_lo[keep], next_opt_hi[keep]
+
+        splits.append(split)
+        previous = current
+
+    # Walk the split points back from the last value to recover the segment boundaries
+    boundaries = [n]
+    for split in reversed(splits):
+        boundaries.append(split[boundaries[-1]])
+    boundaries.append(0)
+    boundaries = boundaries[::-1]
+
+    sorted_labels = np.repeat(np.arange(len(boundaries) - 1), np.diff(boundaries))
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = sorted_labels
+    return labels
+
+# Equal-frequency breaks, tied values always share a cluster
+def _quantile_labels(values, n_clusters):
+    edges = np.quantile(values, np.linspace(0, 1, n_clusters + 1)[1:-1])
+    return np.searchsorted(edges, values, side='right')
+
+# Registry of the available clustering backends
+CLUSTER_METHODS = {
+    'optimal': _optimal_labels,
+    'jenks': _optimal_labels,
+    'quantile': _quantile_labels,
+    'ward': _ward_labels,
+}
+
+# Function to cluster one-dimensional data and order the labels by cluster mean
+def cluster_1d(values, n_clusters=3, method='optimal'):
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"Unknown clustering method '{method}', expected one of {sorted(CLUSTER_METHODS)}")
+
+    values = np.asarray(values, dtype=float).ravel()
+    n_clusters = min(n_clusters, len(np.unique(values)))  # Never split identical values apart
+
+    raw_labels = CLUSTER_METHODS[method](values, n_clusters) if n_clusters > 1 else np.zeros(len(values), dtype=np.int64)
+
+    # Relabel clusters so that 0 is the cluster with the highest mean, 1 the next, ...
+    ids = np.unique(raw_labels)
+    means = np.array([values[raw_labels == i].mean() for i in ids])
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[np.argsort(-means, kind='mergesort')] = np.arange(len(ids))
+    labels = rank[np.searchsorted(ids, raw_labels)]
+
+    return ClusterResult(labels_=labels, centers_=np.sort(means)[::-1], method=method)
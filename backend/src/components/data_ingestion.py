@@ -3,49 +3,38 @@ import os
 import sys
 from src.exception import CustomException  # Importing custom exception handler
 from src.logger import logging  # Importing logging module
-import pandas as pd  # Importing pandas for data manipulation
+from src.utils import save_object  # Importing utility function to save artifacts
+from src.components.dataset_store import load_dataset  # Importing the parsed, indexed dataset
 
 from dataclasses import dataclass  # Importing dataclass for configuration handling
-from src.components import data_preparation  # Importing data preparation component
-from src.components import data_transformation  # Importing data transformation component
 
 # Define dataclass for configuration
 @dataclass
 class DataIngestionConfig:
-    raw_data_path: str = os.path.join('artifacts', "raw_data.csv")  # Default path for raw data storage
+    raw_data_path: str = os.path.join('artifacts', "raw_data.parquet")  # Default path for raw data storage
 
 # Define DataIngestion class for handling data ingestion process
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()  # Initialize with default configuration
 
-    def initiate_data_ingestion(self, enr):
-        logging.info("Entered the Data Ingestion Method")  # Log entry into method
-        print(enr)  # Print enrollment number (debugging or informational)
+    def initiate_data_ingestion(self, enr, persist=True, dataset=None):
+        logging.info(f"Entered the Data Ingestion Method for enrollment {enr}")  # Log entry into method
 
         try:
-            # Read the CSV file into a pandas DataFrame
-            df = pd.read_csv(r'notebook/data/StudentDataset.csv')
-            logging.info("Successfully Read the Dataset as Dataframe")  # Log successful read
+            # Use the dataset parsed at upload time, reading and indexing the CSV file only if needed
+            if dataset is None:
+                dataset = load_dataset()
 
-            # Assign unique IDs to each row in the DataFrame
-            df['Id'] = [i for i in range(len(df))]
-            logging.info("Indexing of ID column is completed")  # Log completion of indexing
+            # Select the grade cohort of the enrollment number (enr) from the grade index
+            dataset = dataset.cohort(dataset.grade_of(enr))
 
-            # Clean column names by removing extra spaces
-            for column in df.columns:
-                if " '" in column:
-                    df.rename(columns={column: column.replace(" '","")}, inplace=True)
-
-            # Filter dataset based on enrollment number (enr)
-            dataset = df[df['Current Year (17/18)'] == df['Current Year (17/18)'][enr]]
-
-            # Create directories if they don't exist, then save filtered dataset to CSV
-            os.makedirs(os.path.dirname(self.ingestion_config.raw_data_path), exist_ok=True)
-            dataset.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            if persist:
+                # Save filtered dataset as a typed columnar artifact
+                save_object(self.ingestion_config.raw_data_path, dataset)
             logging.info("Ingestion of the Data is Completed")  # Log completion of data ingestion
 
-            return self.ingestion_config.raw_data_path  # Return path to the ingested raw data
+            return dataset  # Return the ingested cohort so later stages can use it in memory
 
         except Exception as e:
             raise CustomException(e, sys)  # Raise custom exception with the caught error
@@ -54,4 +43,4 @@ class DataIngestion:
 if __name__ == "__main__":
     enr = int(sys.argv[1])  # Retrieve enrollment number from command-line arguments
     obj = DataIngestion()  # Create instance of DataIngestion class
-    raw_data_path = obj.initiate_data_ingestion(enr)  # Initiate data ingestion and retrieve raw data path
\ No newline at end of file
+    raw_data = obj.initiate_data_ingestion(enr)  # Initiate data ingestion and save the raw data
\ No newline at end of file
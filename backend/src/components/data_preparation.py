@@ -1,12 +1,13 @@
 import pandas as pd  # Import pandas for data manipulation
 import numpy as np  # Import numpy for numerical operations
+from pandas.api.types import is_numeric_dtype  # Import dtype check for numerical features
 from dataclasses import dataclass  # Import dataclass for configuration handling
 import sys  # Import sys for system-specific parameters and functions
 import os  # Import os for operating system dependent functionality
 from src.exception import CustomException  # Import custom exception handler
-from src.logger import logging  # Import logging module for logging messages
-from src.utils import save_object  # Import utility function to save objects
-from src.components import data_ingestion  # Import data ingestion component
+from src.logger import logging, LazyValue  # Import logging module and lazily computed log arguments
+from src.utils import save_object, load_object  # Import utility functions to save and load objects
+from src.components.schema import compile_schema  # Import the compiled schema of a header
 
 # DataPreparationConfig dataclass to hold configuration options
 @dataclass
@@ -17,74 +18,80 @@ class DataPreparationConfig:
 class DataPreparation:
     def __init__(self):
         self.data_preparation_config = DataPreparationConfig()  # Initialize with default configuration
+        self.statistics = {}  # Null counts, coerced cells and medians of the last preparation
 
     # Method to initiate data preparation
-    def initiate_data_preparation(self, raw_data_path):
+    def initiate_data_preparation(self, raw_data, persist=True):
         try:
-            # Load raw dataset from CSV
-            dataset = pd.read_csv(raw_data_path)
+            # Use the in-memory dataset when one is passed, otherwise load the raw data artifact
+            if isinstance(raw_data, pd.DataFrame):
+                dataset = raw_data.copy(deep=False)  # Columns are only ever replaced, so the caller's frame is left untouched
+            else:
+                dataset = load_object(raw_data)
             logging.info("Successfully Read the Raw data")  # Log successful data read
 
-            # Step 1: Finding Missing Values
-            features_na = [feature for feature in dataset.columns if dataset[feature].isnull().sum() > 1]
-            logging.info(f"Features with missing values: {features_na}")  # Log features with missing values
-            for feature in features_na:
-                logging.info(f"{feature}: {np.round(dataset[feature].isnull().mean(), 4)}% missing values")  # Log percentage of missing values per feature
-
-            # Step 2: Replace Missing Values with NaN
-            def is_float(string):
-                try:
-                    float(string)
-                    return True
-                except ValueError:
-                    return False
-
-            feature_float = [feature for feature in dataset.columns if 'exam' in feature and dataset[feature].dtypes == 'O']
-            logging.info(f"Float features: {feature_float}")  # Log float-type features
-            for feature in feature_float:
-                dataset[feature] = dataset[feature].apply(lambda x: x if is_float(x) else np.nan)  # Convert non-float values to NaN
-                dataset[feature] = dataset[feature].astype(float)  # Convert column to float type
+            # Step 1: Finding Missing Values, counted for every column in a single pass
+            null_counts = dataset.isnull().sum()
+            features_na = null_counts.index[null_counts > 1].tolist()
+            logging.debug("Features with missing values: %s", features_na)  # Log features with missing values
+            logging.debug("Missing value ratio: %s", LazyValue(lambda: (null_counts[features_na] / max(len(dataset), 1)).round(4).to_dict()))  # Log share of missing values per feature, computed only at DEBUG
+
+            # Step 2: Replace Non-numeric Exam Values with NaN, parsing every exam column in one batched call
+            schema = compile_schema(dataset.columns)  # Exam columns resolved once per header
+            feature_float = [feature for feature in schema.exam_columns if not is_numeric_dtype(dataset[feature])]
+            logging.debug("Float features: %s", feature_float)  # Log float-type features
+            coerced_cells = {}
+            if feature_float:
+                raw_values = dataset[feature_float].to_numpy(dtype=object)
+                parsed = pd.to_numeric(pd.Series(raw_values.ravel()), errors='coerce').to_numpy(dtype=float).reshape(raw_values.shape)
+                parsed_missing = np.isnan(parsed)
+                coerced = parsed_missing & pd.notna(raw_values)  # Cells that held text instead of a number
+                for position, feature in enumerate(feature_float):
+                    dataset[feature] = parsed[:, position]  # Step 3: Exam columns are now float
+                    coerced_cells[feature] = int(coerced[:, position].sum())
+                    null_counts[feature] = int(parsed_missing[:, position].sum())
 
             logging.info("Successfully Completed Finding and Replacing of Missing Values")  # Log completion of missing values replacement
 
-            # Step 3: Convert Datatype of Columns to Necessary Types
-            for feature in feature_float:
-                dataset[feature] = dataset[feature].astype(float)  # Convert float features to float type
-
-            dataset.info()  # Display dataset information
-            logging.info("Successfully Converted Datatypes of Columns to float")  # Log datatype conversion completion
-
             # Step 4: Distinguish Categorical and Numerical Features
-            numerical_features = [feature for feature in dataset.columns if dataset[feature].dtypes != 'O']  # Identify numerical features
-            logging.info(f"Numerical features: {numerical_features}")  # Log numerical features
-            logging.info(dataset[numerical_features].head())  # Log sample of numerical feature data
+            numerical_features = [feature for feature in dataset.columns if is_numeric_dtype(dataset[feature])]  # Identify numerical features
+            logging.debug("Numerical features: %s", numerical_features)  # Log numerical features
 
-            categorical_features = [feature for feature in dataset.columns if dataset[feature].dtypes == 'O']  # Identify categorical features
-            logging.info(f"Categorical features: {categorical_features}")  # Log categorical features
-            logging.info(dataset[categorical_features].head())  # Log sample of categorical feature data
+            categorical_features = [feature for feature in dataset.columns if not is_numeric_dtype(dataset[feature])]  # Identify categorical features
+            logging.debug("Categorical features: %s", categorical_features)  # Log categorical features
 
-            # Step 5: Replace NaN values in Numerical Features with Median Values
-            numerical_with_nan = [feature for feature in dataset.columns if dataset[feature].isnull().sum() > 1 and dataset[feature].dtypes != 'O']
-            logging.info(f"Numerical features with NaN: {numerical_with_nan}")  # Log numerical features with NaN
+            # Step 5: Replace NaN values in Numerical Features with their Median, all medians computed at once
+            numerical_with_nan = [feature for feature in numerical_features if null_counts[feature] > 1]
+            logging.debug("Numerical features with NaN: %s", numerical_with_nan)  # Log numerical features with NaN
+            medians = dataset[numerical_with_nan].median()
             for feature in numerical_with_nan:
-                median_value = dataset[feature].median()  # Calculate median value of the feature
-                dataset[feature] = dataset[feature].fillna(median_value)  # Replace NaN values with median
-            logging.info(dataset[numerical_with_nan].isnull().sum())  # Log sum of NaN values after replacement
+                dataset[feature] = dataset[feature].fillna(medians[feature])  # Replace NaN values with median
+
+            # Structured statistics of the preparation instead of dataset.info() output
+            self.statistics = {
+                'rows': len(dataset),
+                'null_counts': {feature: int(count) for feature, count in null_counts.items()},
+                'coerced_cells': coerced_cells,
+                'medians': {feature: float(value) for feature, value in medians.items()},
+            }
+            logging.debug("Preparation statistics: %s", self.statistics)  # Log preparation statistics
 
-            logging.info("Data preparation completed.")  # Log completion of data preparation
+            logging.info("Data preparation completed.", extra={'rows': len(dataset), 'coerced_cells': sum(coerced_cells.values())})  # Log completion of data preparation
 
             # Prepare dictionary object for saving
             preparation = {
                 'numerical_features': numerical_features,
                 'categorical_features': categorical_features,
+                'statistics': self.statistics,
             }
 
-            # Save preparation object to file
-            save_object(
-                file_path=self.data_preparation_config.preparation_obj_file_path,
-                obj=preparation
-            )
-            logging.info(f"Preparation object saved at: {self.data_preparation_config.preparation_obj_file_path}")  # Log path where preparation object is saved
+            if persist:
+                # Save preparation object to file
+                save_object(
+                    file_path=self.data_preparation_config.preparation_obj_file_path,
+                    obj=preparation
+                )
+                logging.info(f"Preparation object saved at: {self.data_preparation_config.preparation_obj_file_path}")  # Log path where preparation object is saved
 
             return (
                 numerical_features,
@@ -97,4 +104,4 @@ class DataPreparation:
 # Entry point of the script
 if __name__ == "__main__":
     data_preparation = DataPreparation()  # Create instance of DataPreparation class
-    data_preparation.initiate_data_preparation('artifacts/raw_data.csv')  # Initiate data preparation process
+    data_preparation.initiate_data_preparation('artifacts/raw_data.parquet')  # Initiate data preparation process
@@ -0,0 +1,88 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import threading  # Import threading to guard the loaded dataset between Flask workers
+from dataclasses import dataclass  # Import dataclass for configuration handling
+
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.utils import dataset_fingerprint  # Import content hash of the uploaded file
+from src.components.schema import GRADE_COLUMN, clean_column, read_schema  # Import the compiled schema of the uploaded header
+
+# StudentDatasetConfig dataclass to hold configuration options
+@dataclass
+class StudentDatasetConfig:
+    dataset_path: str = os.path.join('notebook', 'data', 'StudentDataset.csv')  # Default path of the uploaded dataset
+
+# StudentDataset class, the uploaded dataset parsed once and indexed by grade and Id
+class StudentDataset:
+    def __init__(self, frame, fingerprint=None):
+        self.frame = frame  # Cleaned dataset with an Id column
+        self.fingerprint = fingerprint  # Content hash of the file the dataset was read from
+
+        grades = frame[GRADE_COLUMN]
+        groups = grades.groupby(grades, sort=False, dropna=False)
+        self.grade_rows = groups.indices  # Grade -> row positions of its students, in file order
+        self.grades = list(self.grade_rows)  # Every grade cohort, in order of first appearance
+        self.cohort_offsets = groups.cumcount().to_numpy()  # Position of every row inside its own cohort
+        self.id_rows = pd.Index(frame['Id'])  # Hash index from Id to row position
+
+    # Method to read and clean a dataset file, parsing only the grade and score columns
+    @classmethod
+    def from_csv(cls, file_path, fingerprint=None):
+        try:
+            schema = read_schema(file_path)  # Compiled once per header
+            try:
+                df = pd.read_csv(file_path, usecols=schema.raw_used_columns(), dtype=schema.dtypes())
+            except ValueError:
+                # Text in a term score column, parse those columns as before and let the stages coerce them
+                logging.info("Score columns hold text, reading them with type inference")
+                df = pd.read_csv(file_path, usecols=schema.raw_used_columns(), dtype=schema.dtypes(float_scores=False))
+            logging.info("Successfully Read the Dataset as Dataframe")  # Log successful read
+
+            # Assign unique IDs to each row in the DataFrame
+            df['Id'] = np.arange(len(df))
+
+            # Clean column names by removing extra spaces
+            df.columns = [clean_column(column) for column in df.columns]
+
+            return cls(df, fingerprint)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method returning the grade cohort of an enrollment number
+    def grade_of(self, enr):
+        return self.frame[GRADE_COLUMN].at[enr]
+
+    # Method returning every student of a grade cohort as a new DataFrame
+    def cohort(self, grade):
+        rows = self.grade_rows.get(grade, np.empty(0, dtype=np.intp))
+        return self.frame.take(rows).reset_index(drop=True)
+
+    # Method returning the grade of a student and its row position inside that cohort
+    def locate(self, student_id):
+        row = self.id_rows.get_loc(student_id)
+        return self.frame[GRADE_COLUMN].iat[row], int(self.cohort_offsets[row])
+
+    def __len__(self):
+        return len(self.frame)
+
+# Datasets parsed so far, keyed by file path
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+# Function returning the parsed dataset of a file, parsing it again only when its content changed
+def load_dataset(file_path=None):
+    file_path = file_path or StudentDatasetConfig().dataset_path
+    fingerprint = dataset_fingerprint(file_path)
+
+    with _datasets_lock:
+        dataset = _datasets.get(file_path)
+        if dataset is None or dataset.fingerprint != fingerprint:
+            dataset = StudentDataset.from_csv(file_path, fingerprint)
+            _datasets[file_path] = dataset
+            logging.info(f"Loaded dataset {file_path} with {len(dataset)} rows")
+
+    return dataset
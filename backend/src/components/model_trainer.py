@@ -2,36 +2,45 @@ import sys  # Import sys for system-specific parameters and functions
 import os  # Import os for operating system dependent functionality
 import numpy as np  # Import numpy for numerical operations
 import pandas as pd  # Import pandas for data manipulation
-import matplotlib.pyplot as plt  # Import matplotlib for plotting
-import scipy.cluster.hierarchy as sc  # Import scipy for hierarchical clustering
 
 from dataclasses import dataclass  # Import dataclass for configuration handling
-from sklearn.linear_model import LinearRegression  # Import LinearRegression for trend calculation
-from sklearn.preprocessing import StandardScaler  # Import StandardScaler for data scaling
-from sklearn.cluster import AgglomerativeClustering  # Import AgglomerativeClustering for clustering
 
-from src.components import data_ingestion  # Import data ingestion component
-from src.components import data_preparation  # Import data preparation component
-from src.components import data_transformation  # Import data transformation component
 from src.logger import logging  # Import logging module for logging messages
 from src.exception import CustomException  # Import custom exception handler
-from src.utils import save_object  # Import utility function to save objects
-from sklearn.model_selection import train_test_split  # Import train_test_split for data splitting
+from src.utils import save_object, load_object  # Import utility functions to save and load objects
+from src.components.trend import TrendStats, calculate_trends, trend_status  # Import batched trend computation
+from src.components.clustering import ClusterResult, cluster_1d  # Import one-dimensional clustering backends
+from src.components.performance_model import PerformanceModel  # Import the model classifying new students
+from src.components.result_schema import compact_frame, expand_frame  # Import the compact result types
 
 # ModelTrainerConfig dataclass to hold configuration options
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join('artifacts', 'model.pkl')  # Default path for saving trained model
-    final_data_path: str = os.path.join('artifacts', 'final_data.csv')  # Default path for saving final evaluated data
+    final_data_path: str = os.path.join('artifacts', 'final_data.parquet')  # Default path for saving final evaluated data
+    raw_data_path: str = os.path.join('artifacts', 'raw_data.parquet')  # Default path of the ingested raw data
+    trend_stats_path: str = os.path.join('artifacts', 'trend_stats.npz')  # Default path of the per-student trend sums
+    performance_model_path: str = os.path.join('artifacts', 'performance_model.npz')  # Default path of the scalers and cluster cut points
+    cluster_method: str = 'optimal'  # Clustering backend: 'optimal', 'jenks', 'quantile' or 'ward'
+    n_clusters: int = 3  # Number of performance groups (Strong, Moderate, Weak)
+    n_jobs: int = 1  # Worker processes for the per-subject analysis, 1 runs it in this process
 
 # ModelTrainer class for training and evaluating models
 class ModelTrainer:
-    def __init__(self):
+    def __init__(self, cluster_method=None, n_jobs=None):
         self.model_trainer_config = ModelTrainerConfig()  # Initialize with default configuration
+        if cluster_method is not None:
+            self.model_trainer_config.cluster_method = cluster_method  # Override the clustering backend for this run
+        if n_jobs is not None:
+            self.model_trainer_config.n_jobs = n_jobs  # Override the number of worker processes for this run
+        self.trends = {}  # Per-row trend slopes of the last evaluation, keyed by subject
+        self.trend_stats = {}  # Per-row TrendStats of the last evaluation, keyed by subject
 
     # Method to scale input data using StandardScaler
     def scale_data(self, x_data):
         try:
+            from sklearn.preprocessing import StandardScaler  # Imported on first use, scikit-learn is slow to import
+
             scaler = StandardScaler()  # Initialize StandardScaler
             x_scaled_data = scaler.fit_transform(x_data)  # Fit and transform input data
 
@@ -41,11 +50,14 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys)  # Raise custom exception if an error occurs during scaling
 
-    # Method to train a clustering model using Agglomerative Clustering
+    # Method to cluster one-dimensional performance data, label 0 being the highest cluster
     def train_model(self, x_scaled_train):
         try:
-            cluster = AgglomerativeClustering(n_clusters=3, metric='euclidean', linkage='ward')  # Initialize clustering model
-            cluster.fit(x_scaled_train)  # Fit clustering model to scaled training data
+            cluster = cluster_1d(
+                x_scaled_train,
+                n_clusters=self.model_trainer_config.n_clusters,
+                method=self.model_trainer_config.cluster_method,
+            )  # Fit the configured clustering backend to scaled training data
 
             logging.info("Model training completed.")  # Log completion of model training
 
@@ -53,37 +65,70 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys)  # Raise custom exception if an error occurs during model training
 
-    # Method to calculate trend using Linear Regression
+    # Method to calculate the least-squares trend of a single series of scores
     def calculate_trend(self, scores):
-        X = np.arange(len(scores)).reshape(-1, 1)  # Create X array for linear regression
-        y = scores  # Define y as input scores
-
-        model = LinearRegression()  # Initialize Linear Regression model
-        model.fit(X, y)  # Fit model to X and y
-
-        trend = model.coef_[0]  # Calculate trend coefficient
-
-        return trend  # Return calculated trend coefficient
+        return calculate_trends(np.asarray(scores, dtype=float))[0]  # Return calculated trend coefficient
+
+    # Method to accumulate overall and per-subject trend statistics for every student at once
+    def calculate_trend_stats(self, data, feature_all, feature_math, feature_science, feature_english):
+        return {
+            'overall': TrendStats.from_scores(data[feature_all]),
+            'math': TrendStats.from_scores(data[feature_math]),
+            'science': TrendStats.from_scores(data[feature_science]),
+            'english': TrendStats.from_scores(data[feature_english]),
+        }
+
+    # Method to calculate overall and per-subject trend slopes for every student at once
+    def calculate_trends(self, data, feature_all, feature_math, feature_science, feature_english):
+        trend_stats = self.calculate_trend_stats(data, feature_all, feature_math, feature_science, feature_english)
+        return {subject: stats.slopes() for subject, stats in trend_stats.items()}
+
+    # Method to calculate the rounded mean performance of a subject from its statistics and cluster it
+    def cluster_performance(self, stats):
+        performance = np.round(stats.means(), 2)  # Per-student mean over the subject's terms
+        cluster = self.train_model(self.scale_data(performance.reshape(-1, 1)))  # Performance groups of the subject
+        return performance, cluster
+
+    # Method to calculate the trend statistics, rounded mean performance and performance clusters of one subject
+    def analyze_subject(self, scores):
+        stats = TrendStats.from_scores(scores)  # Per-student trend sums over the subject's terms
+        performance, cluster = self.cluster_performance(stats)
+        return stats, performance, cluster
+
+    # Method to analyse overall, math, science and english either in this process or in worker processes
+    def analyze_subjects(self, data, feature_all, feature_math, feature_science, feature_english):
+        subjects = {'overall': feature_all, 'math': feature_math, 'science': feature_science, 'english': feature_english}
+
+        if self.model_trainer_config.n_jobs > 1:
+            from src.components.parallel import analyze_subjects_parallel  # Import only when the parallel mode is used
+
+            positions = {feature: i for i, feature in enumerate(feature_all)}
+            return analyze_subjects_parallel(
+                data[feature_all].to_numpy(dtype=float),
+                {subject: [positions[feature] for feature in features] for subject, features in subjects.items()},
+                self.model_trainer_config.cluster_method,
+                self.model_trainer_config.n_clusters,
+                n_workers=self.model_trainer_config.n_jobs,
+            )
+
+        return {subject: self.analyze_subject(data[features]) for subject, features in subjects.items()}
 
     # Method to evaluate model based on student performance trends
-    def evaluate_model(self, data, feature_all, feature_math, feature_science, feature_english):
+    def evaluate_model(self, data, feature_all, feature_math, feature_science, feature_english, trend_stats=None):
         try:
             new_data = data[feature_all]  # Select relevant features from data
-            math_data = data[feature_math]  # Select math-related features
-            science_data = data[feature_science]  # Select science-related features
-            english_data = data[feature_english]  # Select english-related features
 
-            # Calculate overall trends for each student
-            overall_trends = [self.calculate_trend(new_data.loc[i].dropna()) for i in range(len(new_data))]
-            math_trends = [self.calculate_trend(math_data.loc[i].dropna()) for i in range(len(new_data))]
-            science_trends = [self.calculate_trend(science_data.loc[i].dropna()) for i in range(len(new_data))]
-            english_trends = [self.calculate_trend(english_data.loc[i].dropna()) for i in range(len(new_data))]
+            # Calculate overall and per-subject trends for each student, ignoring missing terms, unless already known
+            if trend_stats is None:
+                trend_stats = self.calculate_trend_stats(data, feature_all, feature_math, feature_science, feature_english)
+            self.trend_stats = trend_stats
+            self.trends = {subject: stats.slopes() for subject, stats in trend_stats.items()}
 
             # Determine improvement status based on trends
-            improvement_status = ["Improving" if x > 0 else "Declining" if x < 0 else "Stable" for x in overall_trends]
-            math_improvement_status = ["Improving" if x > 0 else "Declining" if x < 0 else "Stable" for x in math_trends]
-            science_improvement_status = ["Improving" if x > 0 else "Declining" if x < 0 else "Stable" for x in science_trends]
-            english_improvement_status = ["Improving" if x > 0 else "Declining" if x < 0 else "Stable" for x in english_trends]
+            improvement_status = trend_status(self.trends['overall'])
+            math_improvement_status = trend_status(self.trends['math'])
+            science_improvement_status = trend_status(self.trends['science'])
+            english_improvement_status = trend_status(self.trends['english'])
 
             # Create final evaluated data with improvement status and overall performance
             final_data = new_data.copy()
@@ -91,7 +136,7 @@ class ModelTrainer:
             final_data['Math Improvement Status'] = math_improvement_status
             final_data['Science Improvement Status'] = science_improvement_status
             final_data['English Improvement Status'] = english_improvement_status
-            final_data['Overall Performance'] = round(new_data.mean(axis=1), 2)
+            final_data['Overall Performance'] = np.round(self.trend_stats['overall'].means(), 2)  # Same sums as the trend fit
 
             logging.info("Evaluation completed.")  # Log completion of evaluation
 
@@ -107,67 +152,212 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys)  # Raise custom exception if an error occurs during model save
 
-    # Method to save final evaluated data to CSV file
+    # Method to save the scalers and cluster cut points new students are classified with
+    def save_performance_model(self, final_new_data):
+        try:
+            save_object(self.model_trainer_config.performance_model_path, PerformanceModel.from_final_data(final_new_data).to_arrays())
+            logging.info("Performance model saved successfully.")
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if an error occurs during file save
+
+    # Method to save the per-student trend statistics with the columns and students they cover
+    def save_trend_stats(self, features, ids):
+        try:
+            arrays = {'Id': np.asarray(ids)}
+            for subject, stats in self.trend_stats.items():
+                arrays.update(stats.to_arrays(prefix=f"{subject}_"))
+                arrays[f"{subject}_features"] = np.array(features[subject], dtype=str)
+            save_object(self.model_trainer_config.trend_stats_path, arrays)
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if an error occurs during file save
+
+    # Method to load the saved trend statistics, returning them with the columns and students they cover
+    def load_trend_stats(self):
+        try:
+            arrays = load_object(self.model_trainer_config.trend_stats_path)
+            subjects = [name[:-len('_features')] for name in arrays if name.endswith('_features')]
+            trend_stats = {subject: TrendStats.from_arrays(arrays, prefix=f"{subject}_") for subject in subjects}
+            features = {subject: arrays[f"{subject}_features"].tolist() for subject in subjects}
+            return trend_stats, features, arrays['Id']
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if an error occurs during file load
+
+    # Method to save final evaluated data to the artifact store
     def save_file(self, final_new_data):
         try:
-            os.makedirs(os.path.dirname(self.model_trainer_config.final_data_path), exist_ok=True)  # Create directory if it doesn't exist
-            final_new_data.to_csv(self.model_trainer_config.final_data_path, index=False, header=True)  # Save final data to CSV file
+            save_object(self.model_trainer_config.final_data_path, final_new_data)  # Save final data as a typed columnar artifact
         except Exception as e:
             raise CustomException(e, sys)  # Raise custom exception if an error occurs during file save
 
-    # Method to initiate model training process
-    def initiate_model_training(self, new_data_reshaped, feature_all, feature_math, feature_science, feature_english):
+    # Method to assemble the final evaluated data from the scores and the per-subject analysis
+    def build_final_data(self, data, feature_all, feature_math, feature_science, feature_english, analysis, grades, ids, term_averages=None):
+        # Evaluate model and student performance based on features
+        final_new_data = self.evaluate_model(
+            data, feature_all, feature_math, feature_science, feature_english,
+            trend_stats={subject: stats for subject, (stats, _, _) in analysis.items()},
+        )
+
+        cluster_model = analysis['overall'][2]  # Clustering model of the overall performance
+
+        # Assign cluster labels and performance categories to final evaluated data
+        final_new_data['Cluster'] = cluster_model.labels_
+        performance = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in cluster_model.labels_]
+        final_new_data['Performance'] = performance
+
+        final_new_data['Grade'] = grades  # Add Grade information to final data
+        final_new_data['Id'] = ids  # Add Id information to final data
+
+        # Calculate term averages, reusing the ones already known, and overall subject performances
+        for i in range(len(feature_math)):
+            feature = feature_math[i].replace("Math", "Term")
+            if term_averages is not None and feature in term_averages:
+                final_new_data[feature] = term_averages[feature].values
+            else:
+                final_new_data[feature] = round((final_new_data[feature_math[i]] + final_new_data[feature_science[i]] + final_new_data[feature_english[i]]) / 3, 2)
+
+        final_new_data['Overall Math Performance'] = analysis['math'][1]
+        final_new_data['Overall Science Performance'] = analysis['science'][1]
+        final_new_data['Overall English Performance'] = analysis['english'][1]
+
+        # Assign performance categories to math, science, and english performances
+        for subject, column in (('math', 'Math Performance'), ('science', 'Science Performance'), ('english', 'English Performance')):
+            final_new_data[column] = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in analysis[subject][2].labels_]
+
+        return compact_frame(final_new_data)  # float32 scores, categorical labels and narrow integers
+
+    # Method to add new term columns to evaluated data without recomputing the terms already analysed
+    def append_terms(self, final_data, new_terms, trend_stats=None, persist=True):
+        """
+        final_data: evaluated data of a previous run
+        new_terms: the cohort's new term columns (e.g. Math21-1, Science21-1, English21-1), rows in the order of final_data
+        trend_stats: subject -> TrendStats of the previous run, loaded from the trend statistics artifact when None
+        The result is identical to running initiate_model_training on all the terms at once.
+        """
         try:
-            logging.info("Model Training has been initiated")  # Log initiation of model training
+            logging.debug("Appending terms %s", list(new_terms.columns))  # Log the added columns
+
+            final_data = expand_frame(final_data)  # Scores exactly as they were analysed
+
+            old_features = list(final_data.columns[:final_data.columns.get_loc('Improvement Status')])  # Terms already analysed
+            if trend_stats is None:
+                trend_stats, features, ids = self.load_trend_stats()
+                if features['overall'] != old_features or not np.array_equal(ids, final_data['Id'].values):
+                    raise ValueError("Saved trend statistics do not belong to this evaluated data")
+
+            # Same column selection and numeric coercion as DataTransformation
+            new_features = [feature for feature in new_terms.columns if 'Math' in feature or 'Science' in feature or 'English' in feature]
+            if not new_features:
+                raise ValueError("No Math, Science or English columns to append")
+            new_scores = new_terms[new_features].apply(pd.to_numeric, errors='coerce')
+            new_scores.index = final_data.index
+
+            # Add the new columns to copies of the sums, O(students) per column
+            subjects = {
+                'overall': new_features,
+                'math': [feature for feature in new_features if 'Math' in feature],
+                'science': [feature for feature in new_features if 'Science' in feature],
+                'english': [feature for feature in new_features if 'English' in feature],
+            }
+            updated_stats = {}
+            for subject, columns in subjects.items():
+                stats = TrendStats.from_arrays(trend_stats[subject].to_arrays())
+                updated_stats[subject] = stats.update(new_scores[columns])
+
+            # Means come from the updated sums, only the clusters are fitted again
+            analysis = {subject: (stats,) + self.cluster_performance(stats) for subject, stats in updated_stats.items()}
+
+            feature_all = old_features + new_features
+            data = pd.concat([final_data[old_features], new_scores], axis=1)
+            feature_math = [feature for feature in feature_all if 'Math' in feature]
+            feature_science = [feature for feature in feature_all if 'Science' in feature]
+            feature_english = [feature for feature in feature_all if 'English' in feature]
+
+            term_averages = final_data[[feature for feature in final_data.columns if 'Term' in feature]]
+            final_new_data = self.build_final_data(
+                data, feature_all, feature_math, feature_science, feature_english, analysis,
+                final_data['Grade'].values, final_data['Id'].values, term_averages=term_averages,
+            )
+
+            if persist:
+                self.save_model(analysis['overall'][2])  # Save main clustering model
+                self.save_file(final_new_data)  # Save final evaluated data
+                features = {'overall': feature_all, 'math': feature_math, 'science': feature_science, 'english': feature_english}
+                self.save_trend_stats(features, final_new_data['Id'].values)
+                self.save_performance_model(final_new_data)
+
+            logging.info("Terms appended.")  # Log completion of the update
+
+            return final_new_data
+
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if an error occurs during the update
+
+    # Method to train every grade cohort at once, the rows of each cohort being contiguous
+    def initiate_batch_training(self, new_data_reshaped, feature_all, feature_math, feature_science, feature_english, grades, ids, cohort_bounds):
+        """
+        Trend statistics, means and term averages are computed over the full score matrix in one pass,
+        only the clustering runs once per cohort. cohort_bounds holds the start of every cohort and the
+        total number of rows. Every cohort's rows equal those of initiate_model_training on that cohort.
+        """
+        try:
+            logging.info(f"Batch training of {len(cohort_bounds) - 1} cohorts has been initiated")
 
-            logging.info(f"new_data_reshaped shape: {new_data_reshaped.shape}")  # Log shape of reshaped data
-            logging.info(f"feature_all: {feature_all}")  # Log list of all features
+            data = pd.DataFrame(new_data_reshaped, columns=feature_all)
+            subjects = {'overall': feature_all, 'math': feature_math, 'science': feature_science, 'english': feature_english}
 
-            # Evaluate model and student performance based on features
-            final_new_data = self.evaluate_model(pd.DataFrame(new_data_reshaped, columns=feature_all), feature_all, feature_math, feature_science, feature_english)
+            analysis = {}
+            for subject, features in subjects.items():
+                stats = TrendStats.from_scores(data[features])  # Every student of every cohort at once
+                performance = np.round(stats.means(), 2)
 
-            x_data = final_new_data['Overall Performance'].values.reshape(-1, 1)  # Select overall performance data
+                # Performance groups are relative to the cohort, so each cohort is scaled and clustered on its own
+                labels = np.empty(len(data), dtype=np.int64)
+                for start, stop in zip(cohort_bounds[:-1], cohort_bounds[1:]):
+                    if stop > start:
+                        labels[start:stop] = self.train_model(self.scale_data(performance[start:stop].reshape(-1, 1))).labels_
+                cluster = ClusterResult(labels_=labels, centers_=None, method=self.model_trainer_config.cluster_method)  # Centres differ per cohort
 
-            x_scaled_data = self.scale_data(x_data)  # Scale overall performance data
+                analysis[subject] = (stats, performance, cluster)
 
-            cluster_model = self.train_model(x_scaled_data)  # Train clustering model on scaled data
+            final_data = self.build_final_data(data, feature_all, feature_math, feature_science, feature_english, analysis, grades, ids)
 
-            # Assign cluster labels and performance categories to final evaluated data
-            final_new_data['Cluster'] = cluster_model.labels_
-            performance = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in cluster_model.labels_]
-            final_new_data['Performance'] = performance
+            logging.info("Batch training completed.")
 
-            data = pd.read_csv("artifacts/raw_data.csv")  # Load raw data for additional features
-            final_new_data['Grade'] = data["Current Year (17/18)"]  # Add Grade information to final data
-            final_new_data['Id'] = data["Id"]  # Add Id information to final data
+            return final_data
 
-            # Calculate term averages and overall subject performances
-            for i in range(len(feature_math)):
-                feature = feature_math[i].replace("Math", "Term")
-                final_new_data[feature] = round((final_new_data[feature_math[i]] + final_new_data[feature_science[i]] + final_new_data[feature_english[i]]) / 3, 2)
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if an error occurs during batch training
+
+    # Method to initiate model training process
+    def initiate_model_training(self, new_data_reshaped, feature_all, feature_math, feature_science, feature_english, raw_data=None, persist=True):
+        try:
+            logging.info("Model Training has been initiated")  # Log initiation of model training
+
+            logging.debug("new_data_reshaped shape: %s", new_data_reshaped.shape)  # Log shape of reshaped data
+            logging.debug("feature_all: %s", feature_all)  # Log list of all features
 
-            final_new_data['Overall Math Performance'] = round(final_new_data[feature_math].mean(axis=1), 2)
-            final_new_data['Overall Science Performance'] = round(final_new_data[feature_science].mean(axis=1), 2)
-            final_new_data['Overall English Performance'] = round(final_new_data[feature_english].mean(axis=1), 2)
+            data = pd.DataFrame(new_data_reshaped, columns=feature_all)
 
-            # Train clustering models for math, science, and english performances
-            cluster_math_model = self.train_model(self.scale_data(final_new_data['Overall Math Performance'].values.reshape(-1, 1)))
-            cluster_science_model = self.train_model(self.scale_data(final_new_data['Overall Science Performance'].values.reshape(-1, 1)))
-            cluster_english_model = self.train_model(self.scale_data(final_new_data['Overall English Performance'].values.reshape(-1, 1)))
+            # Trend statistics, mean performances and clusters of every subject, independent of each other
+            analysis = self.analyze_subjects(data, feature_all, feature_math, feature_science, feature_english)
 
-            # Assign performance categories to math, science, and english performances
-            performance_math = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in cluster_math_model.labels_]
-            final_new_data['Math Performance'] = performance_math
+            # Use the in-memory raw data when one is passed, otherwise load only the Grade and Id columns of the artifact
+            students = raw_data if raw_data is not None else load_object(self.model_trainer_config.raw_data_path, columns=["Current Year (17/18)", "Id"])
 
-            performance_science = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in cluster_science_model.labels_]
-            final_new_data['Science Performance'] = performance_science
+            final_new_data = self.build_final_data(
+                data, feature_all, feature_math, feature_science, feature_english, analysis,
+                students["Current Year (17/18)"].values, students["Id"].values,
+            )
+            cluster_model = analysis['overall'][2]  # Clustering model of the overall performance
 
-            performance_english = ['Strong' if i == 0 else 'Moderate' if i == 1 else 'Weak' for i in cluster_english_model.labels_]
-            final_new_data['English Performance'] = performance_english
+            if persist:
+                self.save_model(cluster_model)  # Save main clustering model
 
-            self.save_model(cluster_model)  # Save main clustering model
+                self.save_file(final_new_data)  # Save final evaluated data
 
-            self.save_file(final_new_data)  # Save final evaluated data to CSV
+                features = {'overall': feature_all, 'math': feature_math, 'science': feature_science, 'english': feature_english}
+                self.save_trend_stats(features, final_new_data['Id'].values)  # Save the sums later terms are added to
+                self.save_performance_model(final_new_data)  # Save the model new students are classified with
 
             logging.info("Model training and evaluation completed.")  # Log completion of model training and evaluation
 
@@ -183,7 +373,7 @@ if __name__ == "__main__":
     test_data_path = 'artifacts/test_reshaped.csv'  # Define path to test data CSV
 
     data_transformation_obj = DataTransformation()  # Create instance of DataTransformation class
-    new_data_reshaped, new_data_feature, feature_math, feature_science, feature_english = data_transformation_obj.get_data_transformer_object('artifacts/raw_data.csv')
+    new_data_reshaped, new_data_feature, feature_math, feature_science, feature_english = data_transformation_obj.get_data_transformer_object('artifacts/raw_data.parquet')
 
     model_trainer_obj = ModelTrainer()  # Create instance of ModelTrainer class
     model_trainer_obj.initiate_model_training(new_data_reshaped, new_data_feature, feature_math, feature_science, feature_english)  # Initiate model training and evaluation
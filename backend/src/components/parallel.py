@@ -0,0 +1,189 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import threading  # Import threading to guard the shared process pool
+import multiprocessing  # Import multiprocessing for the worker start method
+from concurrent.futures import ProcessPoolExecutor  # Import process pool for multi-core execution
+from dataclasses import dataclass  # Import dataclass for shared-memory descriptors
+from multiprocessing import shared_memory  # Import shared memory blocks for score matrices
+
+import numpy as np  # Import numpy for numerical operations
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging, log_to_queue, worker_log_queue  # Import logging and the queue workers log through
+
+# SharedArray dataclass, the picklable description of a numpy array held in shared memory
+@dataclass(frozen=True)
+class SharedArray:
+    name: str  # Name of the shared memory block
+    shape: tuple  # Shape of the array
+    dtype: str  # Numpy dtype of the array
+
+    # Method mapping the block into this process, returning the array view and the block to close afterwards
+    def attach(self):
+        block = shared_memory.SharedMemory(name=self.name)  # Workers share the creator's resource tracker, which unlinks it once
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=block.buf), block
+
+# SharedArrays class, a context manager copying arrays into shared memory and unlinking them on exit
+class SharedArrays:
+    def __init__(self):
+        self._blocks = []
+
+    # Method copying an array into a new shared memory block and returning its descriptor
+    def share(self, array):
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        return SharedArray(name=block.name, shape=array.shape, dtype=array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+# Function returning the default number of worker processes
+def default_workers():
+    return int(os.getenv('PARALLEL_WORKERS', os.cpu_count() or 1))
+
+# Modules the fork server imports once, every worker forked from it starts with them already loaded
+PRELOAD_MODULES = ['src.components.model_trainer', 'sklearn.preprocessing']
+
+# Function run once in every worker, sending its log records to the parent and importing the training stage before the first task arrives
+def _init_worker(log_queue):
+    log_to_queue(log_queue)
+    import src.components.model_trainer  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+
+# Task run by prewarm_process_pool, returning once the worker is up
+def _ready():
+    return os.getpid()
+
+# Process pool shared by every parallel run, created on first use
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Function returning the shared process pool, created once and never replaced, job threads may still be submitting to it
+def get_process_pool(n_workers=None):
+    global _pool, _pool_workers
+    n_workers = max(n_workers or 0, default_workers())  # At least every core, workers are only started when tasks need them
+
+    with _pool_lock:
+        if _pool is None:
+            # Workers are forked from a clean server process, safe even when called from the Flask job threads
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                context.set_forkserver_preload(PRELOAD_MODULES)  # Imported once in the server instead of in every worker
+            _pool = ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=context, initializer=_init_worker, initargs=(worker_log_queue(context),),
+            )
+            _pool_workers = n_workers
+            logging.info(f"Started a {method} process pool with up to {n_workers} workers")
+        elif n_workers > _pool_workers:
+            logging.info(f"{n_workers} workers requested, the shared process pool keeps its {_pool_workers}")
+        return _pool
+
+# Function starting every worker of the shared pool ahead of the first parallel run, returning their process ids
+def prewarm_process_pool(n_workers=None):
+    try:
+        n_workers = n_workers or default_workers()
+        pool = get_process_pool(n_workers)
+        # One task per worker, all in flight at once, so the pool starts every worker
+        pids = {future.result() for future in [pool.submit(_ready) for _ in range(n_workers)]}
+        logging.info(f"Pre-warmed {len(pids)} pipeline workers")
+        return pids
+    except Exception as e:
+        raise CustomException(e, sys)
+
+# Function shutting the shared process pool down
+def shutdown_process_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool, _pool_workers = None, 0
+
+# Worker function analysing one subject of a shared score matrix
+def _analyze_subject(scores, columns, cluster_method, n_clusters):
+    from src.components.model_trainer import ModelTrainer  # Import inside the worker, model_trainer imports this module
+
+    matrix, block = scores.attach()
+    try:
+        model_trainer = ModelTrainer(cluster_method=cluster_method)
+        model_trainer.model_trainer_config.n_clusters = n_clusters
+        return model_trainer.analyze_subject(matrix[:, columns])
+    finally:
+        del matrix  # Release the view before the block is closed
+        block.close()
+
+# Function computing trend slopes, mean performance and clusters of several subjects in worker processes
+def analyze_subjects_parallel(scores, subjects, cluster_method, n_clusters, n_workers=None):
+    """
+    scores: (students, terms) float matrix of every exam column
+    subjects: subject name -> column positions in scores
+    Returns subject name -> (trend stats, performance, cluster) like ModelTrainer.analyze_subject
+    """
+    try:
+        pool = get_process_pool(n_workers)
+        with SharedArrays() as shared:
+            descriptor = shared.share(np.asarray(scores, dtype=float))  # One copy of the matrix, read by every worker
+            futures = {
+                subject: pool.submit(_analyze_subject, descriptor, list(columns), cluster_method, n_clusters)
+                for subject, columns in subjects.items()
+            }
+            results = {subject: future.result() for subject, future in futures.items()}
+
+        logging.info(f"Analysed {len(subjects)} subjects in parallel")
+        return results
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+# Worker function running model training for one cohort of shared scores and Ids
+def _train_cohort(scores, ids, grade, features, cluster_method):
+    from src.components.model_trainer import ModelTrainer  # Import inside the worker, model_trainer imports this module
+    import pandas as pd  # Import pandas for the cohort's Grade and Id columns
+
+    matrix, score_block = scores.attach()
+    id_array, id_block = ids.attach()
+    try:
+        feature_exam, feature_math, feature_science, feature_english = features
+        raw_data = pd.DataFrame({'Current Year (17/18)': [grade] * len(id_array), 'Id': id_array.copy()})
+
+        model_trainer = ModelTrainer(cluster_method=cluster_method)
+        final_data = model_trainer.initiate_model_training(
+            matrix.copy(), feature_exam, feature_math, feature_science, feature_english,
+            raw_data=raw_data, persist=False,
+        )
+        return final_data, model_trainer.trend_stats
+    finally:
+        del matrix, id_array  # Release the views before the blocks are closed
+        score_block.close()
+        id_block.close()
+
+# Function training several cohorts in worker processes
+def train_cohorts_parallel(cohorts, cluster_method=None, n_workers=None):
+    """
+    cohorts: grade -> (scores, ids, (feature_exam, feature_math, feature_science, feature_english))
+    Returns grade -> (final_data, trend_stats)
+    """
+    try:
+        pool = get_process_pool(n_workers)
+        with SharedArrays() as shared:
+            futures = {}
+            for grade, (scores, ids, features) in cohorts.items():
+                score_descriptor = shared.share(np.asarray(scores, dtype=float))
+                id_descriptor = shared.share(np.asarray(ids))
+                futures[grade] = pool.submit(_train_cohort, score_descriptor, id_descriptor, grade, features, cluster_method)
+            results = {grade: future.result() for grade, future in futures.items()}
+
+        logging.info(f"Trained {len(cohorts)} cohorts in parallel")
+        return results
+
+    except Exception as e:
+        raise CustomException(e, sys)
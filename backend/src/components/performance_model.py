@@ -0,0 +1,157 @@
+import sys  # Import sys for system-specific parameters and functions
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from dataclasses import dataclass  # Import dataclass for the model
+
+from src.exception import CustomException  # Import custom exception handler
+from src.components.trend import TrendStats, trend_status  # Import batched trend computation
+from src.components.clustering import PERFORMANCE_LABELS  # Import the performance category labels
+from src.components.result_schema import expand_frame  # Import the conversion back from the compact result types
+
+# Subject -> (performance column, performance category column, improvement status column) of the evaluated data
+SUBJECT_COLUMNS = {
+    'overall': ('Overall Performance', 'Performance', 'Improvement Status'),
+    'math': ('Overall Math Performance', 'Math Performance', 'Math Improvement Status'),
+    'science': ('Overall Science Performance', 'Science Performance', 'Science Improvement Status'),
+    'english': ('Overall English Performance', 'English Performance', 'English Improvement Status'),
+}
+
+# Function turning cluster labels into performance categories, None for students without scores
+def performance_labels(labels):
+    return [None if i < 0 else PERFORMANCE_LABELS[min(i, len(PERFORMANCE_LABELS) - 1)] for i in labels]
+
+# PerformanceModel dataclass, the scaler and cluster cut points of every subject of one trained cohort
+@dataclass
+class PerformanceModel:
+    features: dict  # Subject -> term columns averaged into the subject's performance
+    scalers: dict  # Subject -> (mean, scale) of the StandardScaler the clusters were fitted on
+    cuts: dict  # Subject -> ascending cut points between the clusters, in scaled units
+    shares: dict  # Subject -> share of the cohort in each cluster label, the drift reference
+    ranges: dict  # Subject -> (lowest, highest) performance seen in training
+    n_students: int  # Size of the cohort the model was trained on
+
+    # Method rebuilding the model from evaluated data, the clusters being contiguous ranges of the performance
+    @classmethod
+    def from_final_data(cls, final_data):
+        try:
+            from sklearn.preprocessing import StandardScaler  # Imported on first use, the scaling the clusters were fitted on
+
+            final_data = expand_frame(final_data)  # Performances exactly as they were clustered
+            feature_all = list(final_data.columns[:final_data.columns.get_loc('Improvement Status')])
+            features = {
+                'overall': feature_all,
+                'math': [feature for feature in feature_all if 'Math' in feature],
+                'science': [feature for feature in feature_all if 'Science' in feature],
+                'english': [feature for feature in feature_all if 'English' in feature],
+            }
+
+            scalers, cuts, shares, ranges = {}, {}, {}, {}
+            for subject, (performance_column, label_column, _) in SUBJECT_COLUMNS.items():
+                performance = final_data[performance_column].to_numpy(dtype=float)
+                labels = final_data[label_column].map({label: i for i, label in enumerate(PERFORMANCE_LABELS)}).to_numpy()
+                present = ~np.isnan(performance)
+
+                # Same fit as ModelTrainer.scale_data, so the scaled values match the ones that were clustered
+                scaler = StandardScaler().fit(performance[present].reshape(-1, 1))
+                scaled = (performance - scaler.mean_[0]) / scaler.scale_[0]
+
+                # Halfway between the highest value of a cluster and the lowest value of the cluster above it
+                n_clusters = int(np.nanmax(labels)) + 1
+                cuts[subject] = np.array([
+                    (scaled[labels == i].max() + scaled[labels == i - 1].min()) / 2
+                    for i in range(n_clusters - 1, 0, -1)
+                ])
+                scalers[subject] = np.array([scaler.mean_[0], scaler.scale_[0]])
+                shares[subject] = np.bincount(labels[present].astype(np.int64), minlength=n_clusters) / present.sum()
+                ranges[subject] = np.array([performance[present].min(), performance[present].max()])
+
+            return cls(features, scalers, cuts, shares, ranges, len(final_data))
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def __post_init__(self):
+        # Every subject's columns as one row of positions into the scores, padded with the position of an all-missing column
+        subjects = list(self.features)
+        positions = {feature: i for i, feature in enumerate(self.features['overall'])}
+        width = max(len(features) for features in self.features.values())
+        padding = len(positions)
+        self._subjects = subjects
+        self._columns = np.array([
+            [positions[feature] for feature in self.features[subject]] + [padding] * (width - len(self.features[subject]))
+            for subject in subjects
+        ])
+
+        # Cut points of every subject padded with infinity, so one comparison labels all subjects at once
+        n_cuts = max(len(self.cuts[subject]) for subject in subjects)
+        self._cuts = np.array([np.pad(self.cuts[subject], (0, n_cuts - len(self.cuts[subject])), constant_values=np.inf) for subject in subjects])
+        self._n_cuts = np.array([len(self.cuts[subject]) for subject in subjects])
+        self._scalers = np.array([self.scalers[subject] for subject in subjects])
+
+    # Method predicting the performance, cluster and trend of every subject for rows of scores
+    def predict(self, scores):
+        """
+        scores: (students, terms) matrix whose columns are features['overall'], NaN for missing scores
+        Returns subject -> (rounded mean performance, cluster labels, improvement status), labels being -1 without scores
+        """
+        scores = np.asarray(scores, dtype=float)
+        if scores.ndim == 1:
+            scores = scores.reshape(1, -1)  # A single student
+        rows = len(scores)
+
+        # (subjects * students, terms) matrix, trailing missing scores leave the sums of the shorter subjects unchanged
+        padded = np.column_stack((scores, np.full(rows, np.nan)))
+        stacked = padded[:, self._columns].transpose(1, 0, 2).reshape(len(self._subjects) * rows, -1)
+        stats = TrendStats.from_scores(stacked)
+        performance = np.round(stats.means(), 2)  # Same rounding as the training run
+
+        # Scaled as in training, the label is the number of cut points above the value, 0 being the highest cluster
+        subject_rows = np.repeat(np.arange(len(self._subjects)), rows)
+        scaled = (performance - self._scalers[subject_rows, 0]) / self._scalers[subject_rows, 1]
+        below = (self._cuts[subject_rows] <= scaled[:, None]).sum(axis=1)
+        labels = np.where(np.isnan(performance), -1, self._n_cuts[subject_rows] - below)
+        status = trend_status(stats.slopes())
+
+        return {
+            subject: (performance[i * rows:(i + 1) * rows], labels[i * rows:(i + 1) * rows], status[i * rows:(i + 1) * rows])
+            for i, subject in enumerate(self._subjects)
+        }
+
+    # Method returning the model as named arrays, for storing in one file
+    def to_arrays(self):
+        arrays = {'n_students': np.array(self.n_students)}
+        for subject in self.features:
+            arrays[f"{subject}_features"] = np.array(self.features[subject], dtype=str)
+            arrays[f"{subject}_scaler"] = self.scalers[subject]
+            arrays[f"{subject}_cuts"] = self.cuts[subject]
+            arrays[f"{subject}_shares"] = self.shares[subject]
+            arrays[f"{subject}_range"] = self.ranges[subject]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        subjects = [name[:-len('_features')] for name in arrays if name.endswith('_features')]
+        return cls(
+            features={subject: arrays[f"{subject}_features"].tolist() for subject in subjects},
+            scalers={subject: arrays[f"{subject}_scaler"] for subject in subjects},
+            cuts={subject: arrays[f"{subject}_cuts"] for subject in subjects},
+            shares={subject: arrays[f"{subject}_shares"] for subject in subjects},
+            ranges={subject: arrays[f"{subject}_range"] for subject in subjects},
+            n_students=int(arrays['n_students']),
+        )
+
+    # Method returning the predictions as a DataFrame with the column names of the evaluated data
+    def predict_frame(self, scores, ids=None):
+        predictions = self.predict(scores)
+        frame = pd.DataFrame(index=range(len(predictions['overall'][0])))
+        if ids is not None:
+            frame['Id'] = ids
+        for subject, (performance_column, label_column, status_column) in SUBJECT_COLUMNS.items():
+            performance, labels, status = predictions[subject]
+            frame[status_column] = status
+            frame[performance_column] = performance
+            if subject == 'overall':
+                frame['Cluster'] = labels
+            frame[label_column] = performance_labels(labels)
+        return frame
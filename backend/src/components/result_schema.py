@@ -0,0 +1,77 @@
+import hashlib  # Import hashlib for the result version
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from src.components.trend import TREND_LABELS  # Import the improvement status labels
+from src.components.clustering import PERFORMANCE_LABELS  # Import the performance category labels
+
+# Label columns of the evaluated data and the dictionary of codes they share, in code order
+LABEL_CATEGORIES = {
+    'Improvement Status': TREND_LABELS,
+    'Math Improvement Status': TREND_LABELS,
+    'Science Improvement Status': TREND_LABELS,
+    'English Improvement Status': TREND_LABELS,
+    'Performance': PERFORMANCE_LABELS,
+    'Math Performance': PERFORMANCE_LABELS,
+    'Science Performance': PERFORMANCE_LABELS,
+    'English Performance': PERFORMANCE_LABELS,
+}
+
+# Decimal places every score and performance of the evaluated data is given to
+SCORE_DECIMALS = 2
+
+# Function returning a float column as float32 when rounding it back to float64 gives the same values
+def _compact_float(column):
+    narrow = column.to_numpy(dtype=np.float32)
+    restored = np.round(narrow.astype(np.float64), SCORE_DECIMALS)
+    return narrow if np.array_equal(restored, column.to_numpy(dtype=np.float64), equal_nan=True) else column
+
+# Function storing evaluated data in compact types: float32 scores, categorical labels and narrow integers
+def compact_frame(df):
+    """
+    Scores and performances become float32 when they have at most two decimals, which is how
+    every training run produces them; other float columns are left as they are. Label columns
+    become categoricals over LABEL_CATEGORIES (int8 codes), Grade a categorical of the cohort
+    names and integer columns the narrowest integer type that holds them. expand_frame undoes it.
+    """
+    columns = {}
+    for name, column in df.items():
+        if name in LABEL_CATEGORIES or name == 'Grade':
+            known = list(LABEL_CATEGORIES.get(name, ()))
+            extra = sorted(set(column.dropna().astype(str)) - set(known))  # Values outside the shared dictionary are kept
+            columns[name] = pd.Categorical(column, categories=known + extra)
+        elif pd.api.types.is_float_dtype(column.dtype):
+            columns[name] = _compact_float(column)
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            columns[name] = pd.to_numeric(column, downcast='integer')
+        else:
+            columns[name] = column
+    return pd.DataFrame(columns, index=df.index)
+
+# Function returning evaluated data in the types the pipeline has always produced, for output and exact arithmetic
+def expand_frame(df):
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = column.astype('str')  # Missing labels stay missing
+        elif column.dtype == np.float32:
+            columns[name] = np.round(column.to_numpy(dtype=np.float64), SCORE_DECIMALS)
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            columns[name] = column.astype(np.int64)
+        else:
+            columns[name] = column
+    return pd.DataFrame(columns, index=df.index)
+
+# Function returning the content hash of evaluated data, the version its exports and published files are named by
+def result_version(final_data):
+    row_hashes = pd.util.hash_pandas_object(final_data, index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes() + repr(list(final_data.columns)).encode('utf-8'), digest_size=16).hexdigest()
+
+# Function returning the subject feature groups of evaluated data
+def feature_groups(final_data):
+    features = list(final_data.columns[:final_data.columns.get_loc('Improvement Status')])
+    return {
+        'feature_math': [feature for feature in features if 'Math' in feature],
+        'feature_science': [feature for feature in features if 'Science' in feature],
+        'feature_english': [feature for feature in features if 'English' in feature],
+    }
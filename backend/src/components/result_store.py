@@ -0,0 +1,170 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json for the metadata stored with every version
+import uuid  # Import uuid for unique temporary file names
+import threading  # Import threading to guard the mapped versions
+from urllib.parse import quote  # Import quote to name a cohort's directory after its grade
+from collections import OrderedDict  # Import OrderedDict for the most recently used mapped versions
+from dataclasses import dataclass  # Import dataclass for the store configuration
+
+import pandas as pd  # Import pandas for data manipulation
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.components.result_schema import compact_frame, feature_groups, result_version  # Import the compact result types, feature groups and version
+
+# ResultStoreConfig dataclass to hold configuration options
+@dataclass
+class ResultStoreConfig:
+    store_path: str = os.path.join('artifacts', 'results')  # Root of the published results, one directory per dataset and cohort
+    keep_versions: int = 8  # Published versions kept per cohort, the current one is never removed
+    mapped_versions: int = 4  # Versions kept mapped by every process
+
+# Name of the file holding the version readers are served, one per cohort
+CURRENT_FILE = 'CURRENT'
+
+# Versions mapped by this process, shared by every store object: (cohort directory, version) -> (final data, transformation)
+_mapped = OrderedDict()
+_mapped_lock = threading.Lock()
+
+# Function writing a file under a temporary name and renaming it into place, readers see the old file or the whole new one
+def _write_atomic(file_path, write):
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as file_obj:
+            write(file_obj)
+            file_obj.flush()
+            os.fsync(file_obj.fileno())  # On disk before it becomes visible under its name
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# Function converting a compact frame column into an Arrow array without copying numbers into a validity bitmap
+def _arrow_column(column):
+    import pyarrow as pa  # Import only when a result is published
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(column.cat.codes.to_numpy(), mask=column.isna().to_numpy()),
+            pa.array(column.cat.categories.astype(str).tolist(), type=pa.string()),
+        )
+    if column.dtype.kind in 'fiub':
+        return pa.array(column.to_numpy(), from_pandas=False)  # NaN stays a float value, the column maps zero-copy
+    return pa.array(column.astype(object).where(column.notna(), None).tolist())
+
+# ResultStore class, evaluated data published once as immutable memory-mapped files behind an atomic CURRENT pointer per cohort
+class ResultStore:
+    """
+    Results are keyed by (dataset fingerprint, grade, clustering backend), each key has its own
+    directory <store>/<fingerprint>/<grade>.<backend>/. Every version is one uncompressed Arrow IPC
+    file, <version>.arrow, never modified once renamed into place. The key's CURRENT names the
+    version readers are served and is replaced atomically after the file is complete, so a reader
+    sees either the previous result of the cohort or the new one. Readers map the file read-only:
+    every process serving the same version shares the page cache pages instead of holding its own copy.
+    """
+    def __init__(self, store_path=None):
+        self.result_store_config = ResultStoreConfig()  # Initialize with default configuration
+        if store_path is not None:
+            self.result_store_config.store_path = store_path
+
+    # Method returning the directory of a key's versions
+    def cohort_path(self, key):
+        fingerprint, grade, cluster_method = key
+        return os.path.join(
+            self.result_store_config.store_path, str(fingerprint),
+            f"{quote(str(grade), safe='')}.{cluster_method or 'default'}",  # Grades may hold spaces and slashes
+        )
+
+    def _version_path(self, key, version):
+        return os.path.join(self.cohort_path(key), f"{version}.arrow")
+
+    # Method publishing a cohort's evaluated data and making it the key's current version, returning the version
+    def publish(self, key, final_data):
+        try:
+            import pyarrow as pa  # Import only when a result is published
+
+            store_path = self.cohort_path(key)
+            os.makedirs(store_path, exist_ok=True)
+            final_data = compact_frame(final_data)  # Same types whether or not the caller compacted it
+            version = result_version(final_data)
+
+            version_path = self._version_path(key, version)
+            if not os.path.exists(version_path):  # The same content is only written once
+                table = pa.Table.from_arrays(
+                    [_arrow_column(column) for _, column in final_data.items()],
+                    names=[str(name) for name in final_data.columns],
+                    metadata={'version': version, 'transformation': json.dumps(feature_groups(final_data))},
+                )
+
+                def write(file_obj):
+                    with pa.ipc.new_file(file_obj, table.schema) as writer:
+                        writer.write_table(table)
+
+                _write_atomic(version_path, write)
+
+            _write_atomic(os.path.join(store_path, CURRENT_FILE), lambda file_obj: file_obj.write(version.encode('ascii')))
+            logging.info(f"Published result {version} of {key[1]!r} with {len(final_data)} students")
+            self._prune(store_path, keep=version)
+            return version
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method returning the version of a key readers are served, None before the cohort's first publish
+    def current_version(self, key):
+        try:
+            with open(os.path.join(self.cohort_path(key), CURRENT_FILE)) as file_obj:
+                return file_obj.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # Method returning the evaluated data and feature groups of a key's version, the current one by default, mapped read-only
+    def read(self, key, version=None):
+        try:
+            for _ in range(3):  # The current version may be pruned between reading CURRENT and opening it
+                requested = version or self.current_version(key)
+                if requested is None:
+                    return None
+                try:
+                    return self._map(key, requested)
+                except FileNotFoundError:
+                    if version is not None:
+                        raise
+            raise FileNotFoundError(f"No published result in {self.cohort_path(key)}")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _map(self, key, version):
+        import pyarrow as pa  # Import only when a published result is read
+
+        mapped_key = (os.path.abspath(self.cohort_path(key)), version)
+        with _mapped_lock:
+            if mapped_key in _mapped:
+                _mapped.move_to_end(mapped_key)
+                return _mapped[mapped_key]
+
+        # The table's buffers point into the mapping, numbers are converted to numpy without copying
+        table = pa.ipc.open_file(pa.memory_map(self._version_path(key, version), 'r')).read_all()
+        final_data = table.to_pandas(split_blocks=True, self_destruct=False)
+        transformation = json.loads(table.schema.metadata[b'transformation'])
+        entry = (final_data, transformation)
+
+        with _mapped_lock:
+            _mapped[mapped_key] = entry
+            while len(_mapped) > self.result_store_config.mapped_versions:
+                _mapped.popitem(last=False)
+        return entry
+
+    # Method removing the oldest published versions of a cohort, never the one just published
+    def _prune(self, store_path, keep):
+        versions = sorted(
+            (entry for entry in os.scandir(store_path) if entry.name.endswith('.arrow') and entry.name != f"{keep}.arrow"),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in versions[:max(0, len(versions) + 1 - self.result_store_config.keep_versions)]:
+            try:
+                os.remove(entry.path)  # Processes that still map it keep reading it until they unmap it
+            except OSError:
+                pass
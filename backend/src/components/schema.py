@@ -0,0 +1,97 @@
+import csv  # Import csv to read the header line
+import sys  # Import sys for system-specific parameters and functions
+import hashlib  # Import hashlib for the header hash
+import threading  # Import threading to guard the compiled schemas
+from dataclasses import dataclass, field  # Import dataclass for the compiled schema
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+
+# Column holding the grade cohort of every student
+GRADE_COLUMN = 'Current Year (17/18)'
+
+# Subject of every group of score columns, the name of a column containing the subject's name
+SUBJECTS = ('Math', 'Science', 'English')
+
+# Function returning a column name without the " '" suffix the uploaded files carry
+def clean_column(column):
+    return column.replace(" '", "")
+
+# DatasetSchema dataclass, everything the stages need to know about a header, resolved once
+@dataclass(frozen=True)
+class DatasetSchema:
+    header_hash: str  # Hash of the header the schema was compiled from
+    raw_columns: tuple  # Column names as they appear in the file
+    columns: tuple  # Cleaned column names, in file order
+    score_columns: tuple  # Math, Science and English columns, in file order
+    exam_columns: tuple  # Columns of the entrance exam, which may hold text such as '#VALUE!'
+    subject_columns: dict = field(hash=False)  # 'Math' / 'Science' / 'English' -> the subject's columns, in file order
+    term_columns: tuple = ()  # Per-term averages of evaluated data (Term-exam, Term19-1, ...)
+    grade_column: str = None  # Column of the grade cohort, None when the header has none
+
+    # Columns the pipeline reads from an uploaded file: the grade cohort and the scores
+    @property
+    def used_columns(self):
+        return ((self.grade_column,) if self.grade_column else ()) + self.score_columns
+
+    # Method returning the raw names of the used columns, for usecols
+    def raw_used_columns(self):
+        used = set(self.used_columns)
+        return [raw for raw, column in zip(self.raw_columns, self.columns) if column in used]
+
+    # Method returning the dtype every used raw column is parsed with
+    def dtypes(self, float_scores=True):
+        """
+        The grade is text. Exam columns are read as text and coerced by DataPreparation, which
+        counts the cells that were not numbers. Every other score column is parsed as float, or
+        left to type inference with float_scores=False when a file may hold text there too.
+        """
+        dtypes = {}
+        for raw, column in zip(self.raw_columns, self.columns):
+            if column == self.grade_column or column in self.exam_columns:
+                dtypes[raw] = 'str'
+            elif column in self.score_columns and float_scores:
+                dtypes[raw] = 'float64'
+        return dtypes
+
+# Function compiling the schema of a list of column names, raw or already cleaned
+def _compile(raw_columns, header_hash):
+    columns = tuple(clean_column(column) for column in raw_columns)
+    subject_columns = {subject: tuple(column for column in columns if subject in column) for subject in SUBJECTS}
+    return DatasetSchema(
+        header_hash=header_hash,
+        raw_columns=tuple(raw_columns),
+        columns=columns,
+        score_columns=tuple(column for column in columns if any(subject in column for subject in SUBJECTS)),
+        exam_columns=tuple(column for column in columns if 'exam' in column),
+        subject_columns=subject_columns,
+        term_columns=tuple(column for column in columns if 'Term' in column),
+        grade_column=GRADE_COLUMN if GRADE_COLUMN in columns else None,
+    )
+
+# Schemas compiled so far, keyed by header hash
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+# Function returning the compiled schema of a header, compiling it only the first time the header is seen
+def compile_schema(columns):
+    columns = tuple(str(column) for column in columns)
+    header_hash = hashlib.sha256('\x1f'.join(columns).encode('utf-8')).hexdigest()
+
+    with _schemas_lock:
+        schema = _schemas.get(header_hash)
+    if schema is None:
+        schema = _compile(columns, header_hash)
+        with _schemas_lock:
+            _schemas.setdefault(header_hash, schema)
+        logging.info(f"Compiled schema {header_hash[:12]} with {len(schema.score_columns)} score columns")
+    return schema
+
+# Function returning the compiled schema of a CSV file from its header line alone
+def read_schema(file_path):
+    try:
+        with open(file_path, newline='', encoding='utf-8-sig') as file_obj:
+            header = next(csv.reader(file_obj), [])
+        return compile_schema(header)
+    except Exception as e:
+        raise CustomException(e, sys)
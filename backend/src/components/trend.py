@@ -0,0 +1,89 @@
+import numpy as np  # Import numpy for numerical operations
+from dataclasses import dataclass  # Import dataclass for the trend statistics
+
+# Labels given to positive, negative and flat trends
+TREND_LABELS = ("Improving", "Declining", "Stable")
+
+# Names of the per-row sufficient statistics of a least-squares trend
+TREND_STATISTICS = ("n", "sum_x", "sum_y", "sum_xy", "sum_xx")
+
+# TrendStats class, per-row sums from which slopes and means follow, updated one term column at a time
+@dataclass
+class TrendStats:
+    n: np.ndarray  # Number of scores present per row
+    sum_x: np.ndarray  # Sum of term positions
+    sum_y: np.ndarray  # Sum of scores
+    sum_xy: np.ndarray  # Sum of position * score
+    sum_xx: np.ndarray  # Sum of squared positions
+
+    @classmethod
+    def zeros(cls, rows):
+        return cls(*(np.zeros(rows) for _ in TREND_STATISTICS))
+
+    # Method building the statistics of every column of a score matrix
+    @classmethod
+    def from_scores(cls, scores):
+        scores = np.asarray(scores, dtype=float)  # Accept DataFrames, lists or arrays
+        if scores.ndim == 1:
+            scores = scores.reshape(1, -1)  # Treat a single row as a one-row matrix
+        stats = cls.zeros(scores.shape[0])
+        stats.update(scores)
+        return stats
+
+    # Method adding term columns after the ones already accumulated, in O(rows) per column
+    def update(self, scores):
+        scores = np.asarray(scores, dtype=float)
+        if scores.ndim == 1:
+            scores = scores.reshape(-1, 1)  # A single new term column
+
+        # Position of every score once missing terms are dropped, counting on from the terms already accumulated
+        present = ~np.isnan(scores)
+        x = np.where(present, self.n[:, None] + np.cumsum(present, axis=1) - present, 0.0)
+        y = np.where(present, scores, 0.0)
+
+        # Sequential running sums from the current totals, the same additions in the same order as one column at a time
+        for name, values in (("n", present), ("sum_x", x), ("sum_y", y), ("sum_xy", x * y), ("sum_xx", x * x)):
+            total = getattr(self, name)
+            total[...] = np.add.accumulate(np.column_stack((total, values)), axis=1)[:, -1]
+        return self
+
+    # Method returning the closed-form slope (n Σxy - Σx Σy) / (n Σx² - (Σx)²), 0 with fewer than two scores
+    def slopes(self):
+        numerator = self.n * self.sum_xy - self.sum_x * self.sum_y
+        denominator = self.n * self.sum_xx - self.sum_x * self.sum_x
+        slopes = np.zeros(len(self.n))
+        np.divide(numerator, denominator, out=slopes, where=denominator > 0)
+        return slopes
+
+    # Method returning the mean score of every row, NaN for rows without scores
+    def means(self):
+        means = np.full(len(self.n), np.nan)
+        np.divide(self.sum_y, self.n, out=means, where=self.n > 0)
+        return means
+
+    # Method returning the statistics of some rows only, rows being a slice or positions
+    def subset(self, rows):
+        return TrendStats(*(getattr(self, name)[rows] for name in TREND_STATISTICS))
+
+    # Method returning the statistics as named arrays, prefixed for storing several subjects in one file
+    def to_arrays(self, prefix=""):
+        return {prefix + name: getattr(self, name) for name in TREND_STATISTICS}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        return cls(*(np.array(arrays[prefix + name], dtype=float) for name in TREND_STATISTICS))
+
+# Function to compute least-squares slopes for every row of a score matrix at once
+def calculate_trends(scores):
+    """
+    Batched equivalent of fitting LinearRegression(np.arange(len(row)), row.dropna())
+    on every row. Missing scores are skipped and the remaining ones are numbered
+    0, 1, 2, ... exactly as dropna() followed by np.arange would do.
+    Rows with fewer than two scores get a slope of 0.
+    """
+    return TrendStats.from_scores(scores).slopes()  # Return one slope per row
+
+# Function to turn slopes into Improving / Declining / Stable labels
+def trend_status(slopes):
+    slopes = np.asarray(slopes, dtype=float)
+    return np.where(slopes > 0, TREND_LABELS[0], np.where(slopes < 0, TREND_LABELS[1], TREND_LABELS[2]))
@@ -13,8 +13,18 @@ def error_message_detail(error,error_detail:sys):
 class CustomException(Exception):
     def __init__(self, error_message, error_detail:sys):
         super().__init__(error_message)
-        self.error_message=error_message_detail(error_message , error_detail=error_detail)
+        # Only where the error was raised is kept, the message is built when the exception is printed
+        _,_,exc_tb=error_detail.exc_info()
+        self.file_name=exc_tb.tb_frame.f_code.co_filename if exc_tb is not None else None
+        self.line_number=exc_tb.tb_lineno if exc_tb is not None else None
+        self._error_message=None
+
+    @property
+    def error_message(self):
+        if self._error_message is None:
+            self._error_message="Error Occured in Python Script name [{0}] line number [{1}] error message [{2}]".format(
+            self.file_name,self.line_number,str(self.args[0]))
+        return self._error_message
 
     def __str__(self):
         return self.error_message
-
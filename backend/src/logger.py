@@ -1,15 +1,155 @@
-import logging
 import os
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
 from datetime import datetime
 
-LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path=os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
+# One log file per process, {pid} is its process id; each is rotated on its own once it reaches LOG_MAX_BYTES
+# Server processes sharing the directory never rotate the same file, pool workers send their records to their parent's file
+LOG_DIR=os.path.join(os.getcwd(),"logs")
+LOG_FILE_PATH=os.path.join(LOG_DIR,"pipeline-{pid}.log")
+
+# Level of the root logger, DEBUG also writes the feature lists and missing value ratios of every stage
+LOG_LEVEL=os.environ.get("LOG_LEVEL","INFO").upper()
+LOG_MAX_BYTES=int(os.environ.get("LOG_MAX_BYTES",10*2**20))
+LOG_BACKUP_COUNT=int(os.environ.get("LOG_BACKUP_COUNT",5))
+
+# Attributes every record has, the ones passed with extra= become fields of the JSON record
+_RECORD_ATTRIBUTES=set(vars(logging.LogRecord('',0,'',0,'',(),None)))|{'message','asctime'}
+
+# LazyValue class, a log argument computed only when a record is written at an enabled level
+class LazyValue:
+    """
+    logging.debug("Missing value ratio: %s", LazyValue(lambda: ratios.round(4).to_dict()))
+    The logger drops the call before creating a record when DEBUG is disabled, so the function never runs.
+    """
+    def __init__(self, function):
+        self.function = function
+
+    def __str__(self):
+        return str(self.function())
+
+# Formatter writing every record as one JSON object per line
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).astimezone().isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+# Rotating file handler creating the log directory and the file with the first record, importing the logger writes nothing
+class LazyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        self.filename_pattern = filename  # {pid} is replaced by the id of the process opening the file
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.baseFilename = os.path.abspath(filename.format(pid=os.getpid()))
+        os.register_at_fork(after_in_child=self._reset)  # A forked child opens a file of its own
+
+    def _reset(self):
+        self.stream = None  # Every record is flushed when written, the parent's buffer holds nothing to write twice
+
+    def _open(self):
+        self.baseFilename = os.path.abspath(self.filename_pattern.format(pid=os.getpid()))
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+# Queue handler doing as little as possible on the logging thread
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Only the message is merged here, so its arguments cannot change before the writer reads them; JSON encoding is left to the writer
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)  # Tracebacks cannot be queued to other processes
+            record.exc_info = None
+        return record
 
-LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
+# Queue handler of the current process, a background thread started with the first record writes the queued records
+class BackgroundQueueHandler(RecordQueueHandler):
+    def __init__(self, *handlers):
+        super().__init__(queue.SimpleQueue())
+        self.handlers = handlers  # Handlers the background thread writes to
+        self.listener = None
+        self._listener_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset)  # Threads do not survive a fork, a forked child starts its own
+
+    def _reset(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = None
+        self._listener_lock = threading.Lock()
+
+    def start(self):
+        with self._listener_lock:
+            if self.listener is None:
+                self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+                self.listener.start()
+
+    # Method writing every queued record and stopping the background thread, the next record starts it again
+    def stop(self):
+        with self._listener_lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def emit(self, record):
+        if self.listener is None:
+            self.start()
+        super().emit(record)
+
+file_handler = LazyRotatingFileHandler(LOG_FILE_PATH)
+file_handler.setFormatter(JsonFormatter())
+queue_handler = BackgroundQueueHandler(file_handler)
 
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+    handlers=[queue_handler],
+    level=LOG_LEVEL,
 )
+
+# Queue the worker processes of the process pool send their records through, and the thread writing them
+_worker_queue = None
+_worker_listener = None
+_worker_lock = threading.Lock()
+
+# Function returning the queue worker processes log to, created with the pool's multiprocessing context on first use
+def worker_log_queue(context):
+    global _worker_queue, _worker_listener
+    with _worker_lock:
+        if _worker_queue is None:
+            _worker_queue = context.Queue()
+            _worker_listener = logging.handlers.QueueListener(_worker_queue, file_handler, respect_handler_level=True)
+            _worker_listener.start()
+        return _worker_queue
+
+# Function run in a worker process, sending its records to the parent's log file instead of opening one per worker
+def log_to_queue(log_queue):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(RecordQueueHandler(log_queue))
+
+# Function writing every queued record, run at exit so no record is lost
+def stop_logging():
+    global _worker_queue, _worker_listener
+    queue_handler.stop()
+    with _worker_lock:
+        if _worker_listener is not None:
+            _worker_listener.stop()
+        _worker_queue, _worker_listener = None, None
+
+atexit.register(stop_logging)
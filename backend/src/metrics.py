@@ -0,0 +1,263 @@
+import os
+import time
+import uuid
+import bisect
+import threading
+import functools
+import contextvars
+from collections import deque
+
+from src.logger import logging, queue_handler
+
+# Trace id of the request being served, copied into the background jobs it submits
+trace_id_var = contextvars.ContextVar('trace_id', default=None)
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+def current_trace_id():
+    return trace_id_var.get()
+
+# Filter stamping every record with the trace id of the request or job it was logged in, read on the logging thread
+class TraceIdFilter(logging.Filter):
+    def filter(self, record):
+        record.trace_id = trace_id_var.get()
+        return True
+
+queue_handler.addFilter(TraceIdFilter())
+
+# Default histogram buckets in seconds, from a millisecond to two minutes
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Histogram class, cumulative Prometheus buckets plus a rolling window of recent observations for quantiles
+class Histogram:
+    def __init__(self, buckets=TIME_BUCKETS, window=1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot counts observations above every bucket
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)  # Newest observations, oldest dropped first
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    # Method returning the q-quantile of the rolling window, None before the first observation
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# MetricsRegistry class holding every histogram, counter and gauge, keyed by metric name and labels
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, labels=None, buckets=TIME_BUCKETS, help_text=''):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+                self._help.setdefault(name, help_text)
+            histogram.observe(value)
+
+    def increment(self, name, value=1, labels=None, help_text=''):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._help.setdefault(name, help_text)
+
+    # Method setting a counter whose count is kept by its owner, such as the cache hits, to that count
+    def set_counter(self, name, value, labels=None, help_text=''):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = value
+            self._help.setdefault(name, help_text)
+
+    def set_gauge(self, name, value, labels=None, help_text=''):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+            self._help.setdefault(name, help_text)
+
+    # Method rendering every metric in the Prometheus text exposition format
+    def render(self):
+        lines = []
+        with self._lock:
+            for metric_type, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name in sorted({name for name, _ in metrics}):
+                    lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for (metric, labels), value in sorted(metrics.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_labels(labels)} {value}")
+
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+                # Quantiles of the rolling window, a gauge per quantile
+                lines.append(f"# TYPE {name}_recent gauge")
+                for (metric, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    for q in (0.5, 0.95, 0.99):
+                        value = histogram.quantile(q)
+                        if value is not None:
+                            lines.append(f"{name}_recent{_labels(labels + (('quantile', str(q)),))} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (f'{key}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"' for key, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+# Registry used by the pipeline and the Flask app
+registry = MetricsRegistry()
+
+# Function returning the resident set size of the process in bytes, None when it cannot be read
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Seconds between resident set size samples while a stage runs
+RSS_SAMPLE_INTERVAL = float(os.environ.get("RSS_SAMPLE_INTERVAL", 0.01))
+
+# RssSampler class, a background thread sampling the resident set size while any span is open
+class RssSampler:
+    """
+    The process high-water mark (ru_maxrss) only grows, so it cannot tell one stage's peak from an
+    earlier one's. Every open span instead keeps the largest sample taken while it runs. The resident
+    set size belongs to the process, a stage running next to another one also counts its memory.
+    """
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._spans = set()  # Spans open in any thread of the process
+        self._thread = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset)  # Threads do not survive a fork
+
+    def _reset(self):
+        self._spans = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self._spans.add(span)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+                self._thread.start()
+
+    def remove(self, span):
+        with self._lock:
+            self._spans.discard(span)
+
+    # Method run by the thread until no span is open, it is started again with the next span
+    def _sample(self):
+        while True:
+            rss = current_rss()
+            with self._lock:
+                if not self._spans:
+                    self._thread = None
+                    return
+                for span in self._spans if rss is not None else ():
+                    span.peak_rss_bytes = max(span.peak_rss_bytes, rss)
+            time.sleep(self.interval)
+
+rss_sampler = RssSampler()
+
+# Span class measuring one run of a stage: wall time, CPU time of the running thread, rows and memory
+class Span:
+    def __init__(self, stage, rows=None):
+        self.stage = stage
+        self.rows = rows  # Set inside the with block once the number of rows is known
+
+    def __enter__(self):
+        self.peak_rss_bytes = current_rss()
+        if self.peak_rss_bytes is not None:
+            rss_sampler.add(self)
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.thread_time() - self._cpu
+        self.rss_bytes = current_rss()
+        if self.peak_rss_bytes is not None:
+            rss_sampler.remove(self)
+            self.peak_rss_bytes = max(self.peak_rss_bytes, self.rss_bytes or 0)  # Stages shorter than the interval keep the larger of their two ends
+        status = 'error' if exc_type is not None else 'ok'
+        labels = {'stage': self.stage, 'status': status}
+
+        registry.observe('pipeline_stage_seconds', self.wall_seconds, labels, help_text='Wall time of pipeline stages')
+        registry.observe('pipeline_stage_cpu_seconds', self.cpu_seconds, labels, help_text='CPU time of pipeline stages')
+        if self.rows is not None:
+            registry.increment('pipeline_stage_rows_total', self.rows, {'stage': self.stage}, help_text='Rows processed by pipeline stages')
+        if self.peak_rss_bytes is not None:
+            registry.set_gauge('pipeline_stage_peak_rss_bytes', self.peak_rss_bytes, {'stage': self.stage}, help_text='Peak resident memory of the process while the stage last ran')
+
+        logging.info(
+            "Stage %s finished", self.stage,
+            extra={
+                'stage': self.stage, 'status': status, 'wall_seconds': round(self.wall_seconds, 6), 'cpu_seconds': round(self.cpu_seconds, 6),
+                'rows': self.rows, 'rss_bytes': self.rss_bytes, 'peak_rss_bytes': self.peak_rss_bytes,
+            },
+        )
+        return False
+
+    # Method making the span usable as a decorator, every call is measured by a span of its own
+    def __call__(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Span(self.stage, self.rows) as span:
+                result = function(*args, **kwargs)
+                if span.rows is None and hasattr(result, '__len__'):
+                    span.rows = len(result)
+                return result
+        return wrapper
+
+# Function returning a span for a stage, usable as a context manager or as a decorator
+def instrument(stage, rows=None):
+    """
+    with instrument('DataPreparation') as span:
+        ...
+        span.rows = len(raw_data)
+
+    @instrument('FetchData.fetch')
+    def fetch(...): ...   # rows taken from the length of the return value when it has one
+    """
+    return Span(stage, rows)
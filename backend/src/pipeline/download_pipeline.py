@@ -1,13 +1,151 @@
-import pandas as pd
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass
+
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import instrument
+from src.utils import load_object
+from src.components.result_schema import expand_frame
+
+# Function writing a DataFrame to an Excel file row by row, in constant memory
+def write_xlsx(df, file_path):
+    from openpyxl import Workbook  # Import only when an Excel file is written
+
+    workbook = Workbook(write_only=True)  # Rows are streamed to disk instead of kept as cell objects
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append([str(column) for column in df.columns])
+
+    for start in range(0, len(df), 10000):
+        chunk = df.iloc[start:start + 10000]
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)  # Missing values are left as empty cells, like DataFrame.to_excel
+
+    workbook.save(file_path)
+
+# File writer and response mimetype of every export format
+EXPORT_FORMATS = {
+    'xlsx': (write_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': (lambda df, file_path: df.to_csv(file_path, index=False, header=True), 'text/csv'),
+    'parquet': (lambda df, file_path: df.to_parquet(file_path, index=False), 'application/vnd.apache.parquet'),
+}
+
+# DownloadConfig dataclass to hold configuration options
+@dataclass
+class DownloadConfig:
+    exports_dir: str = os.path.join('artifacts', 'exports')  # Directory of the cached exports, one subdirectory per result version
+    max_versions: int = 64  # Result versions whose exports are kept on disk
+    response_timeout: int = int(os.environ.get('EXPORT_RESPONSE_TIMEOUT', 300))  # Seconds a response may stream an export, versions used more recently are kept
 
 class Download:
+    def __init__(self):
+        self.download_config = DownloadConfig()  # Initialize with default configuration
+        self._locks = {}  # Export path -> lock held while the file is written
+        self._held = {}  # Result version -> responses of this process that may still be reading its exports
+        self._locks_lock = threading.Lock()
+
     @staticmethod
-    def download_data():
+    def download_data(df=None, output_path="artifacts/final_data.xlsx"):
         try:
-            df = pd.read_csv(r'artifacts/final_data.csv')  # Read CSV into DataFrame
-            df.to_excel("artifacts/final_data.xlsx", index=False)  # Save DataFrame to Excel without index
+            if df is None:
+                df = load_object('artifacts/final_data.parquet')  # Read final data artifact into DataFrame
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            write_xlsx(expand_frame(df), output_path)  # Save DataFrame to Excel without index
 
-            print("CSV file successfully converted to Excel.")
+            print("Final data successfully exported to Excel.")
 
         except Exception as e:
             print(f"Error occurred: {str(e)}")
+
+    # Method returning the path of an export of a pipeline result, writing it only the first time it is asked for
+    def export(self, result, file_format='xlsx', columns=None, grade=None):
+        try:
+            if file_format not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown export format {file_format!r}, expected one of {sorted(EXPORT_FORMATS)}")
+            unknown = [column for column in columns or [] if column not in result.final_data.columns]
+            if unknown:
+                raise ValueError(f"Unknown columns {unknown}")
+
+            # Exports of the same result, columns and cohort share one file
+            selection = hashlib.sha256(repr((columns, grade)).encode('utf-8')).hexdigest()[:16]
+            version_dir = os.path.join(self.download_config.exports_dir, result.version)
+            file_path = os.path.join(version_dir, f"{selection}.{file_format}")
+
+            with self._lock_for(file_path):
+                os.makedirs(version_dir, exist_ok=True)
+                os.utime(version_dir)  # Last use of the version, recently used exports may still be streamed by any process
+                if os.path.exists(file_path):
+                    return file_path
+
+                df = result.final_data
+                if grade is not None:
+                    df = df[df['Grade'].astype(str) == str(grade)]  # Students of one cohort only
+                if columns:
+                    df = df[columns]
+
+                writer, _ = EXPORT_FORMATS[file_format]
+                # Written under a temporary name and renamed, readers never see a partial file
+                fd, temp_path = tempfile.mkstemp(dir=version_dir, suffix=f".{file_format}.tmp")
+                os.close(fd)
+                try:
+                    with instrument(f'Download.export.{file_format}', rows=len(df)):
+                        writer(expand_frame(df), temp_path)  # Exported in the types the pipeline has always written
+                    os.replace(temp_path, file_path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+
+                logging.info(f"Exported {len(df)} rows to {file_path}")
+
+            self._prune(keep=result.version)
+            return file_path
+
+        except ValueError:
+            raise  # Invalid requests are reported to the client as they are
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method keeping the exports of a result version on disk until release() is called as often
+    def hold(self, version):
+        """
+        A response holds the version from before export() until the file is open: an open export keeps
+        streaming to the end once its name is removed, only opening a pruned path would fail.
+        """
+        with self._locks_lock:
+            self._held[version] = self._held.get(version, 0) + 1
+
+    def release(self, version):
+        with self._locks_lock:
+            self._held[version] -= 1
+            if not self._held[version]:
+                del self._held[version]
+
+    def _lock_for(self, file_path):
+        with self._locks_lock:
+            return self._locks.setdefault(file_path, threading.Lock())
+
+    # Method removing the exports of the least recently used result versions
+    def _prune(self, keep):
+        """
+        Versions held by a response of this process are skipped, and so are versions used within the
+        response timeout: another server process may still be streaming them, its holds are not seen here.
+        """
+        exports_dir = self.download_config.exports_dir
+        versions = sorted(
+            (entry for entry in os.scandir(exports_dir) if entry.is_dir() and entry.name != keep),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        recent = time.time() - self.download_config.response_timeout
+        for entry in versions[:max(0, len(versions) + 1 - self.download_config.max_versions)]:
+            with self._locks_lock:
+                if entry.name in self._held or entry.stat().st_mtime > recent:
+                    continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            with self._locks_lock:
+                for file_path in [path for path in self._locks if path.startswith(entry.path + os.sep)]:
+                    del self._locks[file_path]
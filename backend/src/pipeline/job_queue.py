@@ -0,0 +1,219 @@
+import os  # Import os for the job records shared with the other server processes
+import re  # Import re to check job identifiers before they name a file
+import json  # Import json for the job records
+import time  # Import time for job timestamps
+import uuid  # Import uuid for job identifiers
+import socket  # Import socket for the host of the process owning a job
+import threading  # Import threading to guard the job registry
+import contextvars  # Import contextvars to carry the request's trace id into the job
+from collections import OrderedDict  # Import OrderedDict to retain the most recent jobs
+from concurrent.futures import Future, ThreadPoolExecutor  # Import thread pool for background pipeline runs
+from dataclasses import dataclass, field  # Import dataclass for job records
+
+from src.logger import logging  # Import logging module for logging messages
+from src.metrics import current_trace_id  # Import the trace id of the submitting request
+
+# QueueFullError raised when the configured number of pending runs is reached
+class QueueFullError(Exception):
+    pass
+
+# Job dataclass, one per submission; submissions for the same key share a single run
+@dataclass
+class Job:
+    job_id: str  # Identifier returned to the client
+    key: tuple  # (dataset hash, cohort, clustering backend) the run computes
+    enrollment: int  # Enrollment number of the submitting client
+    future: Future  # Run producing the pipeline result, shared by merged submissions
+    submitted_at: float = field(default_factory=time.time)
+    trace_id: str = field(default_factory=current_trace_id)  # Trace of the request that submitted the job
+
+    @property
+    def status(self):
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    @property
+    def result(self):
+        return self.future.result() if self.status == 'done' else None
+
+    @property
+    def error(self):
+        return str(self.future.exception()) if self.status == 'failed' else None
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'enrollment': self.enrollment,
+            'submitted_at': self.submitted_at,
+            'error': self.error,
+            'trace_id': self.trace_id,
+        }
+
+# JobRecord dataclass, a job as saved for the other server processes; the result is what the run returned, saved as JSON
+@dataclass
+class JobRecord:
+    job_id: str
+    status: str
+    enrollment: int
+    submitted_at: float
+    error: str = None
+    trace_id: str = None
+    result: object = None
+    host: str = None  # Host of the server process running the job
+    pid: int = None  # Server process running the job
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'enrollment': self.enrollment,
+            'submitted_at': self.submitted_at,
+            'error': self.error,
+            'trace_id': self.trace_id,
+        }
+
+# Job identifiers are uuid4 hex strings, anything else cannot name a record
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+# JobQueue class running pipeline jobs on a bounded thread pool
+class JobQueue:
+    """
+    With a state_path, every job is also saved as <state_path>/<job_id>.json when it is submitted,
+    when its run starts and when it finishes, so any server process sharing the directory answers
+    for jobs another process runs. Runs must then return a JSON-serializable result.
+    A queued or running record whose process has exited is reported as failed, and records
+    older than record_ttl seconds are deleted when the queue is created.
+    """
+    def __init__(self, max_workers=2, max_pending=16, max_jobs=1024, state_path=None, record_ttl=86400):
+        self.max_pending = max_pending  # Maximum number of queued or running runs
+        self.max_jobs = max_jobs  # Number of job records kept for status queries
+        self.state_path = state_path  # Directory of the job records shared between processes, None keeps them in memory only
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline')
+        self._jobs = OrderedDict()  # job_id -> Job, oldest first
+        self._runs = {}  # key -> Future of the run in progress
+        self._lock = threading.RLock()  # Re-entrant, a run finishing during submit() calls back under the lock
+        self._prune_records(record_ttl)
+
+    # Method to submit a run for key, merged with the run already in progress for the same key
+    def submit(self, key, enrollment, compute, cached=None):
+        with self._lock:
+            if cached is not None:
+                # Already computed, the job is finished as soon as it is created
+                future = Future()
+                future.set_result(cached)
+            elif key in self._runs:
+                future = self._runs[key]
+                logging.info(f"Merged submission for {key} into the running job")
+            else:
+                if len(self._runs) >= self.max_pending:
+                    raise QueueFullError(f"{len(self._runs)} pipeline runs are already pending")
+                # The run sees the submitting request's context variables, its stages log that request's trace id
+                future = self._executor.submit(contextvars.copy_context().run, self._run, key, compute)
+                self._runs[key] = future
+                future.add_done_callback(lambda _, key=key: self._finished(key))
+
+            job = Job(job_id=uuid.uuid4().hex, key=key, enrollment=enrollment, future=future)
+            self._jobs[job.job_id] = job
+            self._save(job)
+            future.add_done_callback(lambda _, job=job: self._save(job))
+
+            # Forget the oldest finished jobs once too many records are kept
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.future.done():
+                    break
+                self._jobs.popitem(last=False)
+                self._remove(oldest.job_id)
+
+            return job
+
+    # Method running a submitted computation, the jobs waiting for it are saved as running first
+    def _run(self, key, compute):
+        with self._lock:
+            future = self._runs.get(key)
+            for job in list(self._jobs.values()):
+                if job.future is future:
+                    self._save(job)
+        return compute()
+
+    def _finished(self, key):
+        with self._lock:
+            self._runs.pop(key, None)
+
+    def _record_path(self, job_id):
+        return os.path.join(self.state_path, f"{job_id}.json")
+
+    # Method saving a job's record for the other processes, written under a temporary name and renamed
+    def _save(self, job):
+        if self.state_path is None:
+            return
+        record = {**job.to_dict(), 'result': job.result, 'host': socket.gethostname(), 'pid': os.getpid()}
+        try:
+            os.makedirs(self.state_path, exist_ok=True)
+            temp_path = f"{self._record_path(job.job_id)}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'w') as file_obj:
+                json.dump(record, file_obj)
+            os.replace(temp_path, self._record_path(job.job_id))
+        except (OSError, TypeError) as e:
+            logging.error(f"Could not save job {job.job_id}: {e}")
+
+    def _remove(self, job_id):
+        if self.state_path is not None:
+            try:
+                os.remove(self._record_path(job_id))
+            except OSError:
+                pass
+
+    # Method deleting the records and unfinished temporary files older than ttl seconds, left by earlier server processes
+    def _prune_records(self, ttl):
+        if self.state_path is None or not os.path.isdir(self.state_path):
+            return
+        cutoff = time.time() - ttl
+        for name in os.listdir(self.state_path):
+            path = os.path.join(self.state_path, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass  # Already removed by another process starting at the same time
+
+    # Method checking whether the process that saved a record can still finish its job
+    @staticmethod
+    def _owner_alive(record):
+        if record.pid is None or record.host != socket.gethostname():
+            return True  # A process on another host cannot be checked
+        if record.pid == os.getpid():
+            return False  # This process keeps its own jobs in memory, the record is from an earlier process with the same pid
+        try:
+            os.kill(record.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # The process exists, owned by another user
+        return True
+
+    # Method returning the job of this process, or the record saved by another process, None for an unknown job
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self.state_path is None or not JOB_ID_PATTERN.fullmatch(job_id):
+            return job
+        try:
+            with open(self._record_path(job_id)) as file_obj:
+                record = JobRecord(**json.load(file_obj))
+        except (OSError, ValueError, TypeError):
+            return None
+        if record.status in ('queued', 'running') and not self._owner_alive(record):
+            # The process exited before finishing the job, it will never be saved as done
+            record.status = 'failed'
+            record.error = 'The server process running the job exited, submit it again'
+        return record
+
+    @property
+    def pending(self):
+        return len(self._runs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
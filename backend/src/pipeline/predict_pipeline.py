@@ -1,19 +1,30 @@
+import os
 import sys
+import numpy as np
 import pandas as pd
-import pickle
+from dataclasses import dataclass
 from src.exception import CustomException
+from src.logger import logging
 from src.utils import load_object
+from src.components.performance_model import PerformanceModel
+from src.components.result_schema import expand_frame
+from src.components.schema import compile_schema
 
 class FetchData:
     @staticmethod
-    def fetch():
+    def fetch(result=None):
         try:
-            df = pd.read_csv('artifacts/final_data.csv')  # Read final data CSV into a DataFrame
+            if result is not None:
+                # Serve an in-memory pipeline result without touching the artifacts
+                df = result.final_data
+                data = result.transformation
+            else:
+                df = load_object('artifacts/final_data.parquet')  # Read final data artifact into a DataFrame
+                data = load_object('artifacts/transformed_data.pkl')  # Load transformed data from pickle file
 
-            feature_terms = [feature for feature in df.columns if 'Term' in feature]  # Find columns containing 'Term'
+            df = expand_frame(df)  # Labels as strings and scores as float64, the dashboard's JSON is unchanged
 
-            with open('artifacts/transformed_data.pkl', 'rb') as f:
-                data = pickle.load(f)  # Load transformed data from pickle file
+            feature_terms = list(compile_schema(df.columns).term_columns)  # Term average columns, resolved once per header
 
             # Count occurrences of unique values in 'Performance', 'Math Performance', 'Science Performance', 'English Performance'
             clusters_performance = df['Performance'].value_counts().to_frame().transpose()
@@ -24,4 +35,101 @@ class FetchData:
             return df, feature_terms, data, clusters_performance, clusters_math, clusters_science, clusters_english
 
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+# PredictConfig dataclass to hold configuration options
+@dataclass
+class PredictConfig:
+    performance_model_path: str = os.path.join('artifacts', 'performance_model.npz')  # Default path of the trained performance model
+    max_new_share: float = 0.1  # Retrain once the new students are more than this share of the cohort
+    min_drift_students: int = 20  # Fewer new students than this are too few to compare distributions
+    max_psi: float = 0.2  # Population stability index of the cluster shares above which the clusters are stale
+    max_mean_shift: float = 0.5  # Shift of the mean performance, in training standard deviations
+    max_out_of_range: float = 0.05  # Share of new performances outside the range seen in training
+
+# PredictPipeline class labelling new students with a trained performance model, without clustering again
+class PredictPipeline:
+    def __init__(self, model=None):
+        self.predict_config = PredictConfig()  # Initialize with default configuration
+        self.model = model  # Trained PerformanceModel, loaded from the artifact on first use when None
+
+    def get_model(self):
+        if self.model is None:
+            self.model = PerformanceModel.from_arrays(load_object(self.predict_config.performance_model_path))
+        return self.model
+
+    # Method turning one student (a dict of scores) or several (a DataFrame or a list of dicts) into a score matrix
+    def score_matrix(self, students):
+        features = self.get_model().features['overall']
+        if isinstance(students, dict):
+            # A single student, without building a DataFrame
+            return np.array([[pd.to_numeric(students.get(feature), errors='coerce') for feature in features]], dtype=float), [students.get('Id')]
+
+        students = pd.DataFrame(students)
+        missing = [feature for feature in features if feature not in students.columns]
+        if len(missing) == len(features):
+            raise ValueError(f"None of the model's term columns {features} were given")
+        # Same numeric coercion as DataTransformation, terms not given count as missing scores
+        scores = students.reindex(columns=features).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        ids = students['Id'].tolist() if 'Id' in students.columns else None
+        return scores, ids
+
+    # Method predicting the performance categories and trends of new students
+    def predict(self, students):
+        try:
+            scores, ids = self.score_matrix(students)
+            return self.get_model().predict_frame(scores, ids)
+
+        except ValueError:
+            raise  # Invalid requests are reported to the caller as they are
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method checking whether the new students have moved the cohort too far from the trained clusters
+    def check_drift(self, students):
+        """
+        Compares the new students with the training cohort, per subject: the share of the cohort they make up,
+        the population stability index of their cluster shares, the shift of their mean performance and the
+        share of performances outside the training range. Returns the measures and whether to retrain.
+        """
+        try:
+            config = self.predict_config
+            model = self.get_model()
+            scores, _ = self.score_matrix(students)
+            predictions = model.predict(scores)
+
+            reasons = []
+            new_share = len(scores) / (model.n_students + len(scores))
+            if new_share > config.max_new_share:
+                reasons.append(f"new students are {new_share:.0%} of the cohort")
+
+            subjects = {}
+            for subject, (performance, labels, _) in predictions.items():
+                present = ~np.isnan(performance)
+                if not present.any():
+                    continue
+                reference = model.shares[subject]
+                shares = np.bincount(labels[present], minlength=len(reference)) / present.sum()
+                expected, actual = np.maximum(reference, 1e-4), np.maximum(shares, 1e-4)  # Empty clusters would make the index infinite
+                psi = float(np.sum((actual - expected) * np.log(actual / expected)))
+                mean_shift = float(abs(performance[present].mean() - model.scalers[subject][0]) / model.scalers[subject][1])
+                low, high = model.ranges[subject]
+                out_of_range = float(((performance[present] < low) | (performance[present] > high)).mean())
+                subjects[subject] = {'psi': psi, 'mean_shift': mean_shift, 'out_of_range': out_of_range}
+
+                if out_of_range > config.max_out_of_range:
+                    reasons.append(f"{out_of_range:.0%} of {subject} performances are outside the training range")
+                if present.sum() >= config.min_drift_students:
+                    if psi > config.max_psi:
+                        reasons.append(f"{subject} cluster shares drifted (PSI {psi:.2f})")
+                    if mean_shift > config.max_mean_shift:
+                        reasons.append(f"{subject} mean performance shifted by {mean_shift:.2f} standard deviations")
+
+            if reasons:
+                logging.info(f"Retraining advised: {'; '.join(reasons)}")
+            return {'retrain': bool(reasons), 'reasons': reasons, 'new_share': new_share, 'subjects': subjects}
+
+        except ValueError:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,105 @@
+import sys  # Import sys for system-specific parameters and functions
+import numpy as np  # Import numpy for numerical operations
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.components.performance_model import SUBJECT_COLUMNS  # Import the performance column of every subject
+from src.components.result_schema import expand_frame  # Import the conversion back from the compact result types
+
+# Measures students are ranked by: the mean performance and the slope of the trend
+RANK_METRICS = ('performance', 'trend')
+
+# RankIndex class, the students of a cohort sorted by every subject's performance and trend slope
+class RankIndex:
+    def __init__(self, ids, values):
+        self.positions = {student_id: i for i, student_id in enumerate(ids)}  # Student Id -> row
+        self.values = values  # (subject, metric) -> value per row, NaN for students without scores
+        self.sorted_values = {}  # (subject, metric) -> ascending values of the students that have one
+        self.sorted_ids = {}  # (subject, metric) -> Ids in the order of sorted_values
+
+        ids = np.asarray(ids)
+        for key, column in values.items():
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.lexsort((ids[present], column[present]))]  # Ties ordered by Id, so top-k is stable
+            self.sorted_values[key] = column[order]
+            self.sorted_ids[key] = ids[order]
+
+        self.nbytes = sum(array.nbytes for array in (*self.values.values(), *self.sorted_values.values(), *self.sorted_ids.values()))
+
+    # Method building the index of a pipeline result from its evaluated data and trend slopes
+    @classmethod
+    def build(cls, result):
+        try:
+            columns = [performance_column for performance_column, _, _ in SUBJECT_COLUMNS.values()]
+            performances = expand_frame(result.final_data[columns])  # Rounded float64, as shown on the dashboard
+
+            values = {}
+            for subject, (performance_column, _, _) in SUBJECT_COLUMNS.items():
+                values[(subject, 'performance')] = performances[performance_column].to_numpy(dtype=float)
+                values[(subject, 'trend')] = np.asarray(result.trends[subject], dtype=float)
+
+            logging.info(f"Rank index built for {len(result.final_data)} students")
+            return cls(result.final_data['Id'].tolist(), values)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _key(self, subject, metric):
+        key = (subject, metric)
+        if key not in self.values:
+            raise ValueError(f"Unknown subject {subject!r} or metric {metric!r}, expected one of {sorted(SUBJECT_COLUMNS)} and {list(RANK_METRICS)}")
+        return key
+
+    # Method returning where a student stands in the cohort, None for an unknown student
+    def percentile(self, student_id, subject='overall', metric='performance'):
+        """
+        percentile: share of the cohort strictly below the student plus half of the ties, 0-100
+        rank: 1 for the highest value, tied students share a rank
+        Two binary searches in the sorted values, O(log n).
+        """
+        key = self._key(subject, metric)
+        row = self.positions.get(student_id)
+        if row is None:
+            return None
+
+        value = self.values[key][row]
+        sorted_values = self.sorted_values[key]
+        n = len(sorted_values)
+        if np.isnan(value) or n == 0:
+            return {'value': None, 'percentile': None, 'rank': None, 'n': n}
+
+        below = int(np.searchsorted(sorted_values, value, side='left'))
+        not_above = int(np.searchsorted(sorted_values, value, side='right'))
+        return {
+            'value': float(value),
+            'percentile': round(100 * (below + (not_above - below) / 2) / n, 2),
+            'rank': n - not_above + 1,
+            'n': n,
+        }
+
+    # Method returning the standing of a student in every subject and metric
+    def standings(self, student_id):
+        if student_id not in self.positions:
+            return None
+        return {
+            subject: {metric: self.percentile(student_id, subject, metric) for metric in RANK_METRICS}
+            for subject in SUBJECT_COLUMNS
+        }
+
+    # Method returning the k highest students, or the k lowest ones, with their values
+    def top(self, k=10, subject='overall', metric='performance', bottom=False):
+        key = self._key(subject, metric)
+        k = max(0, int(k))
+        sorted_values, sorted_ids = self.sorted_values[key], self.sorted_ids[key]
+        if bottom:
+            values, ids = sorted_values[:k], sorted_ids[:k]
+        else:
+            values, ids = sorted_values[::-1][:k], sorted_ids[::-1][:k]
+        ranks = len(sorted_values) - np.searchsorted(sorted_values, values, side='right') + 1  # Tied students share a rank
+        return [
+            {'Id': int(student_id), 'value': float(value), 'rank': int(rank)}
+            for student_id, value, rank in zip(ids.tolist(), values.tolist(), ranks)
+        ]
+
+    def __len__(self):
+        return len(self.positions)
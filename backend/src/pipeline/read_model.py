@@ -0,0 +1,64 @@
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json as the fallback encoder
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.pipeline.predict_pipeline import FetchData  # Import the dashboard feature and cluster summaries
+
+try:
+    import orjson  # Fast JSON encoder, used when installed
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# ReadModel class, the /fetch_data response of every student of a pipeline result, serialized once
+class ReadModel:
+    def __init__(self, rows, shared_fields, version):
+        self.rows = rows  # Student Id -> serialized fields of the student's row
+        self.shared_fields = shared_fields  # Serialized fields common to every student of the cohort
+        self.version = version  # Content hash of the result, entity tags are this hash and the student Id
+        self.nbytes = sum(len(fields) for fields in rows.values()) + len(shared_fields)  # Memory held by the serialized responses
+
+    # Method building the read model of a pipeline result
+    @classmethod
+    def build(cls, result):
+        try:
+            df, feature_, feature, clusters_, clusters_math, clusters_science, clusters_english = FetchData.fetch(result)
+
+            # Fields shared by every student of the cohort, serialized once without their enclosing braces
+            shared = dict(feature)
+            shared["feature_"] = feature_
+            shared["clusters_"] = clusters_.to_dict(orient="list")
+            shared["clusters_math"] = clusters_math.to_dict(orient="list")
+            shared["clusters_science"] = clusters_science.to_dict(orient="list")
+            shared["clusters_english"] = clusters_english.to_dict(orient="list")
+            shared_fields = dumps(shared)[1:-1]
+
+            # Missing scores become null, NaN is not valid JSON
+            columns = list(df.columns)
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+            serialized = {}
+            for student_id, values in zip(df["Id"].tolist(), rows):
+                # One-element lists, the shape of DataFrame.to_dict(orient="list") for a single row
+                serialized[student_id] = dumps({column: [value] for column, value in zip(columns, values)})[1:-1]
+
+            logging.info(f"Read model built for {len(serialized)} students")
+            return cls(serialized, shared_fields, result.version)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method returning the (entity tag, JSON bytes) of a student, None when the student is not in the result
+    def get(self, student_id):
+        fields = self.rows.get(student_id)
+        if fields is None:
+            return None
+        # The result version covers every field of the response, the Id tells the students apart
+        return f"{self.version}-{student_id}", b"{" + fields + b"," + self.shared_fields + b"}"
+
+    def __len__(self):
+        return len(self.rows)
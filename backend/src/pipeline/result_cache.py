@@ -0,0 +1,68 @@
+import threading  # Import threading to guard the cache between Flask workers
+from collections import OrderedDict  # Import OrderedDict for LRU ordering
+
+from src.logger import logging  # Import logging module for logging messages
+
+# Function estimating the memory held by a pipeline result
+def result_size(result):
+    if hasattr(result, "results"):  # BatchResult, the sum of its cohorts
+        return sum(result_size(cohort) for cohort in result.results.values())
+    final_data = getattr(result, "final_data", None)
+    if final_data is None:
+        return 0
+    indexes = [getattr(result, name, None) for name in ("read_model", "rank_index")]
+    return int(final_data.memory_usage(index=True, deep=True).sum()) + sum(index.nbytes for index in indexes if index is not None)
+
+# ResultCache class, a thread-safe LRU bounded by entry count and total size
+class ResultCache:
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries  # Maximum number of cached cohorts
+        self.max_bytes = max_bytes  # Maximum estimated memory of all cached results
+        self._entries = OrderedDict()  # key -> (result, size), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)  # Mark as most recently used
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = result_size(result)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+
+            # Evict least recently used results until both bounds hold, always keeping the newest one
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                logging.info(f"Evicted cached result {evicted_key}")
+
+    # Method returning the cached result for key, computing and storing it on a miss
+    def get_or_compute(self, key, compute):
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
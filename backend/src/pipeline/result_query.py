@@ -0,0 +1,184 @@
+import io  # Import io for the buffer Arrow batches are written through
+import sys  # Import sys for system-specific parameters and functions
+import json  # Import json for the cursor
+import base64  # Import base64 to make the cursor safe in a URL
+from dataclasses import dataclass  # Import dataclass for the query
+
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.metrics import instrument  # Import the stage span
+from src.components.trend import TREND_LABELS  # Import the improvement status labels
+from src.components.clustering import PERFORMANCE_LABELS  # Import the performance category labels
+from src.components.performance_model import SUBJECT_COLUMNS  # Import the label columns of every subject
+from src.components.result_schema import expand_frame  # Import the conversion back from the compact result types
+from src.pipeline.read_model import dumps  # Import the JSON encoder of the read model
+
+# Media type of every streamed format
+RESULT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+# Rows converted and written at a time, so a stream holds one chunk in memory however large the export is
+STREAM_CHUNK_ROWS = 5000
+
+# Function returning the evaluated data of every cohort of a result, in a fixed order
+def result_cohorts(result):
+    if hasattr(result, 'results'):  # BatchResult, one result per cohort
+        return [(grade, cohort.final_data) for grade, cohort in result.results.items()]
+    return [(None, result.final_data)]
+
+# Function encoding where the next page starts: the result version, the cohort and the row within it
+def encode_cursor(version, cohort, row):
+    return base64.urlsafe_b64encode(json.dumps([version, cohort, row]).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, version):
+    try:
+        cursor_version, cohort, row = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        cohort, row = int(cohort), int(row)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_version != version:
+        raise ValueError("The cursor belongs to another result, start again without it")
+    return cohort, row
+
+# ResultQuery dataclass, the students of a pipeline result to return and how many at a time
+@dataclass
+class ResultQuery:
+    grades: tuple = ()  # Cohorts to return, every cohort when empty
+    performance: tuple = ()  # Performance categories to keep, every category when empty
+    status: tuple = ()  # Improvement statuses to keep, every status when empty
+    subject: str = 'overall'  # Subject whose performance category and improvement status are filtered on
+    columns: tuple = ()  # Columns to return, every column when empty
+    limit: int = None  # Rows per page, every matching row when None
+    cursor: str = None  # Where the page starts, from the X-Next-Cursor header of the previous page
+
+    def validate(self):
+        if self.subject not in SUBJECT_COLUMNS:
+            raise ValueError(f"Unknown subject {self.subject!r}, expected one of {sorted(SUBJECT_COLUMNS)}")
+        unknown = [label for label in self.performance if label not in PERFORMANCE_LABELS]
+        if unknown:
+            raise ValueError(f"Unknown performance categories {unknown}, expected some of {list(PERFORMANCE_LABELS)}")
+        unknown = [label for label in self.status if label not in TREND_LABELS]
+        if unknown:
+            raise ValueError(f"Unknown improvement statuses {unknown}, expected some of {list(TREND_LABELS)}")
+        if self.limit is not None and self.limit < 1:
+            raise ValueError("limit must be at least 1")
+
+    # Method returning the rows of a cohort that match the filters
+    def _mask(self, grade, final_data):
+        mask = np.ones(len(final_data), dtype=bool)
+        if self.grades and grade is None:  # Single cohort results are filtered on their Grade column
+            mask &= final_data['Grade'].astype(str).isin(self.grades).to_numpy()
+        _, label_column, status_column = SUBJECT_COLUMNS[self.subject]
+        if self.performance:
+            mask &= final_data[label_column].isin(self.performance).to_numpy()
+        if self.status:
+            mask &= final_data[status_column].isin(self.status).to_numpy()
+        return mask
+
+    # Method selecting the rows of the page, returning (columns, [(cohort data, row positions)], next cursor or None)
+    def plan(self, result):
+        """
+        Pages are cut over row positions of the result, which never changes once built, so a cursor
+        stays valid for as long as the result does. Only row positions are held, the rows themselves
+        are read chunk by chunk while streaming.
+        """
+        self.validate()
+        cohorts = [
+            (i, grade, final_data) for i, (grade, final_data) in enumerate(result_cohorts(result))
+            if grade is None or not self.grades or grade in self.grades
+        ]
+
+        # Cohorts of an all-cohorts result may have different terms, every row gets the union of their columns
+        known = {column for _, final_data in result_cohorts(result) for column in final_data.columns}
+        unknown = [column for column in self.columns if column not in known]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}")
+        columns = list(self.columns) or list(dict.fromkeys(column for _, _, final_data in cohorts for column in final_data.columns))
+
+        start_cohort, start_row = decode_cursor(self.cursor, result.version) if self.cursor else (0, 0)
+        remaining = self.limit if self.limit is not None else float('inf')
+        pages, next_cursor = [], None
+        for i, grade, final_data in cohorts:
+            if i < start_cohort:
+                continue
+            offset = start_row if i == start_cohort else 0
+            positions = np.flatnonzero(self._mask(grade, final_data)[offset:]) + offset
+            if remaining <= 0:
+                if len(positions):  # More rows match after the page, the next one starts at the first of them
+                    next_cursor = encode_cursor(result.version, i, int(positions[0]))
+                    break
+                continue
+            taken = positions[:int(min(remaining, len(positions)))]
+            if len(taken):
+                pages.append((final_data, taken))
+            remaining -= len(taken)
+            if len(taken) < len(positions):
+                next_cursor = encode_cursor(result.version, i, int(positions[len(taken)]))
+                break
+
+        return columns, pages, next_cursor
+
+    # Method returning the page as a generator of encoded chunks and the cursor of the next page
+    def stream(self, result, file_format='ndjson'):
+        try:
+            if file_format not in RESULT_FORMATS:
+                raise ValueError(f"Unknown format {file_format!r}, expected one of {sorted(RESULT_FORMATS)}")
+            columns, pages, next_cursor = self.plan(result)
+            rows = sum(len(positions) for _, positions in pages)
+            logging.info(f"Streaming {rows} result rows as {file_format}")
+
+            encode = write_ndjson if file_format == 'ndjson' else write_arrow
+            return encode(columns, pages, result), next_cursor
+
+        except ValueError:
+            raise  # Invalid requests are reported to the client as they are
+        except Exception as e:
+            raise CustomException(e, sys)
+
+# Function returning the rows of a page in chunks, in the types the pipeline has always produced
+def page_chunks(columns, pages):
+    for final_data, positions in pages:
+        present = [column for column in columns if column in final_data.columns]
+        for start in range(0, len(positions), STREAM_CHUNK_ROWS):
+            chunk = expand_frame(final_data.iloc[positions[start:start + STREAM_CHUNK_ROWS]][present])
+            # Columns this cohort does not have are returned empty
+            yield pd.DataFrame({
+                column: chunk[column] if column in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+                for column in columns
+            })
+
+# Function encoding a page as newline-delimited JSON, one student per line
+def write_ndjson(columns, pages, result):
+    rows = sum(len(positions) for _, positions in pages)
+    with instrument('ResultQuery.ndjson', rows=rows):
+        for chunk in page_chunks(columns, pages):
+            records = chunk.astype(object).where(chunk.notna(), None).to_dict(orient='records')
+            yield b''.join(dumps(record) + b'\n' for record in records)
+
+# Function encoding a page as an Arrow IPC stream, one record batch per chunk
+def write_arrow(columns, pages, result):
+    import pyarrow as pa  # Import only when an Arrow stream is written
+
+    # The type of every column comes from the first cohort that has it, so every batch shares one schema
+    cohorts = result_cohorts(result)
+    fields = []
+    for column in columns:
+        final_data = next(final_data for _, final_data in cohorts if column in final_data.columns)
+        fields.append(pa.Schema.from_pandas(expand_frame(final_data[[column]].iloc[:0]), preserve_index=False).field(column))
+    schema = pa.schema(fields)
+
+    rows = sum(len(positions) for _, positions in pages)
+    with instrument('ResultQuery.arrow', rows=rows):
+        buffer = io.BytesIO()
+        with pa.ipc.new_stream(buffer, schema) as writer:
+            for chunk in page_chunks(columns, pages):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()  # Schema of an empty page and the end-of-stream marker
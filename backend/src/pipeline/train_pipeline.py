@@ -0,0 +1,358 @@
+import os  # Import os for operating system dependent functionality
+import sys  # Import sys for system-specific parameters and functions
+import argparse  # Import argparse for the command-line entry point
+import json  # Import json for the batch result manifest
+import shutil  # Import shutil to replace a previous batch result
+import hashlib  # Import hashlib for the result version
+from dataclasses import dataclass, fields  # Import dataclass for the pipeline result
+from functools import cached_property  # Import cached_property for the concatenated batch data
+
+import numpy as np  # Import numpy for numerical operations
+import pandas as pd  # Import pandas for data manipulation
+
+from src.exception import CustomException  # Import custom exception handler
+from src.logger import logging  # Import logging module for logging messages
+from src.metrics import instrument  # Import stage instrumentation
+from src.components.data_ingestion import DataIngestion  # Import data ingestion stage
+from src.components.data_preparation import DataPreparation  # Import data preparation stage
+from src.components.data_transformation import DataTransformation  # Import data transformation stage
+from src.components.model_trainer import ModelTrainer, ModelTrainerConfig  # Import model training stage and its defaults
+from src.components.clustering import CLUSTER_METHODS  # Import the available clustering backends
+from src.components.performance_model import PerformanceModel  # Import the model classifying new students
+from src.components.result_schema import expand_frame, feature_groups, result_version  # Import the result type conversion, feature groups and version
+from src.pipeline.read_model import ReadModel  # Import the serialized responses of a result
+from src.pipeline.rank_index import RankIndex  # Import the per-subject rank index of a result
+from src.utils import save_object, load_object  # Import utility functions to save and load objects
+
+# PipelineResult dataclass holding everything the serving routes need from one run
+@dataclass
+class PipelineResult:
+    final_data: pd.DataFrame  # Evaluated data, identical to artifacts/final_data.parquet
+    transformation: dict  # Subject feature groups, identical to artifacts/transformed_data.pkl
+    trends: dict  # Per-student trend slopes for overall, math, science and english
+    trend_stats: dict = None  # Per-student TrendStats the slopes and means follow from, keyed like trends
+    read_model: ReadModel = None  # Serialized /fetch_data responses, built when the result is created
+    version: str = None  # Content hash of the final data, names the result's cached exports
+    rank_index: RankIndex = None  # Students sorted by every subject's performance and trend, built with the result
+
+    def __post_init__(self):
+        if self.version is None:
+            self.version = result_version(self.final_data)
+        if self.read_model is None:
+            self.read_model = ReadModel.build(self)  # Entity tags depend on the version
+        if self.rank_index is None:
+            self.rank_index = RankIndex.build(self)
+
+    # Method rebuilding the result of saved evaluated data, trends are recomputed from its scores
+    @classmethod
+    def from_final_data(cls, final_data, version=None):
+        transformation = feature_groups(final_data)
+        features = final_data.columns[:final_data.columns.get_loc('Improvement Status')]
+        trend_stats = ModelTrainer().calculate_trend_stats(
+            expand_frame(final_data), list(features), transformation['feature_math'], transformation['feature_science'], transformation['feature_english'],
+        )
+        return cls(
+            final_data=final_data, transformation=transformation,
+            trends={subject: stats.slopes() for subject, stats in trend_stats.items()}, trend_stats=trend_stats, version=version,
+        )
+
+    # Scalers and cluster cut points of the cohort, built the first time a new student is classified
+    @cached_property
+    def performance_model(self):
+        return PerformanceModel.from_final_data(self.final_data)
+
+# BatchResultConfig dataclass to hold configuration options
+@dataclass
+class BatchResultConfig:
+    batch_path: str = os.path.join('artifacts', 'batch')  # Default directory of the partitioned all-cohorts result
+
+# BatchResult class, the results of every grade cohort of one all-cohorts run
+class BatchResult:
+    def __init__(self, results):
+        self.results = results  # Grade -> PipelineResult of the cohort
+        self.grades = {student_id: grade for grade, result in results.items() for student_id in result.final_data['Id'].tolist()}  # Id -> grade
+        self.version = hashlib.blake2b(''.join(result.version for result in results.values()).encode('utf-8'), digest_size=16).hexdigest()
+
+    # Method returning the result of the cohort of a student, None for an unknown student
+    def result_for(self, student_id):
+        grade = self.grades.get(student_id)
+        return self.results[grade] if student_id in self.grades else None
+
+    # Evaluated data of every cohort, one after another, for the school-wide report
+    @cached_property
+    def final_data(self):
+        return pd.concat([result.final_data for result in self.results.values()], ignore_index=True)
+
+    # Method writing one file per cohort and a manifest, replacing a previous batch result as a whole
+    def save(self, directory):
+        try:
+            staging_dir = directory + '.tmp'
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+
+            cohorts = []
+            for i, (grade, result) in enumerate(self.results.items()):
+                file_name = f'cohort-{i:05d}.parquet'
+                save_object(os.path.join(staging_dir, file_name), result.final_data)
+                cohorts.append({'grade': grade, 'file': file_name, 'rows': len(result.final_data), 'version': result.version})
+            with open(os.path.join(staging_dir, 'manifest.json'), 'w') as file_obj:
+                json.dump({'version': self.version, 'cohorts': cohorts}, file_obj)
+
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(staging_dir, directory)
+            logging.info(f"Saved {len(cohorts)} cohorts to {directory}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    # Method reading a saved batch result, trends are recomputed from the saved scores
+    @classmethod
+    def load(cls, directory=None):
+        try:
+            directory = directory or BatchResultConfig().batch_path
+            with open(os.path.join(directory, 'manifest.json')) as file_obj:
+                manifest = json.load(file_obj)
+
+            results = {
+                cohort['grade']: PipelineResult.from_final_data(load_object(os.path.join(directory, cohort['file'])))
+                for cohort in manifest['cohorts']
+            }
+            return cls(results)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def __len__(self):
+        return len(self.grades)
+
+# Function pointing every artifact path of a stage configuration into another directory
+def relocate_artifacts(config, artifacts_dir):
+    for config_field in fields(config):
+        if config_field.name.endswith('_path'):
+            path = getattr(config, config_field.name)
+            setattr(config, config_field.name, os.path.join(artifacts_dir, os.path.basename(path)))
+    return config
+
+# TrainPipeline class running every stage inside the current process
+class TrainPipeline:
+    def __init__(self, persist=False, cluster_method=None, artifacts_dir=None, n_jobs=None):
+        self.persist = persist  # Write the stage artifacts only when asked for
+        self.cluster_method = cluster_method  # Clustering backend for this run, None for the configured default
+        self.artifacts_dir = artifacts_dir  # Directory of this run's artifacts, None for the shared artifacts/ directory
+        self.n_jobs = n_jobs  # Worker processes for the subject analysis or the cohorts, None for the configured default
+
+    # Method to apply the run's artifact directory to a stage configuration
+    def _configure(self, config):
+        return relocate_artifacts(config, self.artifacts_dir) if self.artifacts_dir else config
+
+    # Method to run ingestion, preparation, transformation and training for one enrollment number
+    def run(self, enr, dataset=None):
+        try:
+            logging.info(f"Train pipeline started for enrollment {enr}")  # Log start of the pipeline
+
+            with instrument('TrainPipeline.run') as run_span:
+                with instrument('DataIngestion') as span:
+                    data_ingestion = DataIngestion()
+                    self._configure(data_ingestion.ingestion_config)
+                    raw_data = data_ingestion.initiate_data_ingestion(enr, persist=self.persist, dataset=dataset)  # Select the cohort of the enrollment
+                    span.rows = run_span.rows = len(raw_data)
+
+                with instrument('DataPreparation', rows=len(raw_data)):
+                    data_preparation = DataPreparation()
+                    self._configure(data_preparation.data_preparation_config)
+                    data_preparation.initiate_data_preparation(raw_data, persist=self.persist)  # Prepare a copy of the cohort
+
+                with instrument('DataTransformation', rows=len(raw_data)):
+                    data_transformation = DataTransformation()
+                    self._configure(data_transformation.data_transformation_config)
+                    raw_data_reshaped, feature_exam, feature_math, feature_science, feature_english = data_transformation.get_data_transformer_object(raw_data, persist=self.persist)
+
+                with instrument('ModelTrainer', rows=len(raw_data)):
+                    model_trainer = ModelTrainer(cluster_method=self.cluster_method, n_jobs=self.n_jobs)
+                    self._configure(model_trainer.model_trainer_config)
+                    final_data = model_trainer.initiate_model_training(
+                        raw_data_reshaped, feature_exam, feature_math, feature_science, feature_english,
+                        raw_data=raw_data, persist=self.persist,
+                    )
+
+                with instrument('PipelineResult', rows=len(final_data)):
+                    result = PipelineResult(
+                        final_data=final_data,
+                        transformation={
+                            'feature_math': feature_math,
+                            'feature_science': feature_science,
+                            'feature_english': feature_english,
+                        },
+                        trends=model_trainer.trends,
+                        trend_stats=model_trainer.trend_stats,
+                    )  # Builds the read model and the result version
+
+            logging.info("Train pipeline completed")  # Log completion of the pipeline
+
+            return result
+
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if any stage fails
+
+    # Method to run the pipeline for the cohorts of several enrollment numbers, keyed by grade
+    def run_many(self, enrollments, dataset=None):
+        """
+        Every cohort is run once however many of its students are requested. With more than one
+        worker, the cohorts are trained in worker processes and their results kept in memory only.
+        """
+        try:
+            if dataset is None:
+                from src.components.dataset_store import load_dataset  # Import only when no dataset is passed
+                dataset = load_dataset()
+
+            grades = {}
+            for enr in enrollments:
+                grades.setdefault(dataset.grade_of(enr), enr)  # First enrollment number of every cohort
+
+            if (self.n_jobs or 1) <= 1 or len(grades) == 1:
+                return {grade: self.run(enr, dataset=dataset) for grade, enr in grades.items()}
+
+            # Ingestion, preparation and transformation are cheap slices, done here
+            cohorts, transformations = {}, {}
+            for grade, enr in grades.items():
+                raw_data = DataIngestion().initiate_data_ingestion(enr, persist=False, dataset=dataset)
+                DataPreparation().initiate_data_preparation(raw_data, persist=False)
+                raw_data_reshaped, feature_exam, feature_math, feature_science, feature_english = DataTransformation().get_data_transformer_object(raw_data, persist=False)
+
+                cohorts[grade] = (raw_data_reshaped, raw_data['Id'].to_numpy(), (feature_exam, feature_math, feature_science, feature_english))
+                transformations[grade] = {
+                    'feature_math': feature_math,
+                    'feature_science': feature_science,
+                    'feature_english': feature_english,
+                }
+
+            from src.components.parallel import train_cohorts_parallel  # Import only when the parallel mode is used
+            with instrument('ModelTrainer.parallel', rows=sum(len(ids) for _, ids, _ in cohorts.values())):
+                trained = train_cohorts_parallel(cohorts, cluster_method=self.cluster_method, n_workers=self.n_jobs)
+
+            logging.info(f"Train pipeline completed for {len(grades)} cohorts")  # Log completion of the pipeline
+
+            return {
+                grade: PipelineResult(
+                    final_data=final_data, transformation=transformations[grade],
+                    trends={subject: stats.slopes() for subject, stats in trend_stats.items()}, trend_stats=trend_stats,
+                )
+                for grade, (final_data, trend_stats) in trained.items()
+            }
+
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if any stage fails
+
+    # Method to run the pipeline for every grade cohort of the dataset in one pass
+    def run_all(self, dataset=None):
+        try:
+            if dataset is None:
+                from src.components.dataset_store import load_dataset  # Import only when no dataset is passed
+                dataset = load_dataset()
+
+            logging.info(f"Batch pipeline started for {len(dataset.grades)} cohorts")
+
+            with instrument('TrainPipeline.run_all') as run_span:
+                with instrument('DataIngestion') as span:
+                    # Every cohort's students in file order, the cohorts one after another
+                    cohorts = [dataset.cohort(grade) for grade in dataset.grades]
+                    raw_data = pd.concat(cohorts, ignore_index=True)
+                    cohort_bounds = np.cumsum([0] + [len(cohort) for cohort in cohorts])
+                    span.rows = run_span.rows = len(raw_data)
+
+                with instrument('DataPreparation', rows=len(raw_data)):
+                    data_preparation = DataPreparation()
+                    self._configure(data_preparation.data_preparation_config)
+                    data_preparation.initiate_data_preparation(raw_data, persist=False)  # Only the partitioned result is persisted
+
+                with instrument('DataTransformation', rows=len(raw_data)):
+                    data_transformation = DataTransformation()
+                    self._configure(data_transformation.data_transformation_config)
+                    raw_data_reshaped, feature_exam, feature_math, feature_science, feature_english = data_transformation.get_data_transformer_object(raw_data, persist=False)
+
+                with instrument('ModelTrainer.batch', rows=len(raw_data)):
+                    model_trainer = ModelTrainer(cluster_method=self.cluster_method)
+                    final_data = model_trainer.initiate_batch_training(
+                        raw_data_reshaped, feature_exam, feature_math, feature_science, feature_english,
+                        raw_data["Current Year (17/18)"].values, raw_data["Id"].values, cohort_bounds,
+                    )
+
+                with instrument('PipelineResult', rows=len(final_data)):
+                    transformation = {'feature_math': feature_math, 'feature_science': feature_science, 'feature_english': feature_english}
+                    results = {}
+                    for grade, start, stop in zip(dataset.grades, cohort_bounds[:-1], cohort_bounds[1:]):
+                        rows = slice(start, stop)
+                        results[grade] = PipelineResult(
+                            final_data=final_data.iloc[rows].reset_index(drop=True),
+                            transformation=transformation,
+                            trends={subject: slopes[rows] for subject, slopes in model_trainer.trends.items()},
+                            trend_stats={subject: stats.subset(rows) for subject, stats in model_trainer.trend_stats.items()},
+                        )
+                    batch = BatchResult(results)
+
+                if self.persist:
+                    batch.save(self._configure(BatchResultConfig()).batch_path)
+
+            logging.info("Batch pipeline completed")
+
+            return batch
+
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if any stage fails
+
+    # Method to add a new semester's term columns to a previous result without recomputing its old terms
+    def append_terms(self, result, new_terms):
+        try:
+            model_trainer = ModelTrainer(cluster_method=self.cluster_method)
+            self._configure(model_trainer.model_trainer_config)
+            with instrument('ModelTrainer.append_terms', rows=len(result.final_data)):
+                final_data = model_trainer.append_terms(result.final_data, new_terms, trend_stats=result.trend_stats, persist=self.persist)
+
+            return PipelineResult(
+                final_data=final_data,
+                transformation=feature_groups(final_data),
+                trends=model_trainer.trends,
+                trend_stats=model_trainer.trend_stats,
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)  # Raise custom exception if the update fails
+
+# Entry point of the script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the student performance pipeline in a single process")
+    parser.add_argument("enrollment", type=int, nargs="?", help="Row index of the student whose grade cohort is analysed")
+    parser.add_argument("--all", action="store_true", help="Analyse every grade cohort in one pass into artifacts/batch/")
+    parser.add_argument("--no-persist", action="store_true", help="Keep every stage output in memory only")
+    parser.add_argument("--partitions", default=None, help="Read cohorts from a chunked ingestion directory")
+    parser.add_argument("--export-csv", default=None, help="Also export the final data as CSV to this path")
+    parser.add_argument("--cluster-method", choices=sorted(CLUSTER_METHODS), default=ModelTrainerConfig.cluster_method, help="Clustering backend to use")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Worker processes for the subject analysis")
+    args = parser.parse_args()
+
+    dataset = None
+    if args.partitions:
+        from src.components.chunked_ingestion import load_partitioned_dataset  # Import only when partitions are used
+        dataset = load_partitioned_dataset(args.partitions)
+
+    if args.all or args.enrollment is not None:
+        if dataset is None:
+            from src.components.dataset_store import load_dataset  # Import only when the CLI runs a pipeline
+            dataset = load_dataset()
+    else:
+        parser.error("an enrollment number or --all is required")
+
+    pipeline = TrainPipeline(persist=not args.no_persist, cluster_method=args.cluster_method, n_jobs=args.n_jobs)
+    if args.all:
+        result = pipeline.run_all(dataset=dataset)  # Run the pipeline for every cohort
+        cohorts = result.results
+    else:
+        result = pipeline.run(args.enrollment, dataset=dataset)  # Run the pipeline
+        cohorts = {dataset.grade_of(args.enrollment): result}
+    if not args.no_persist:
+        from src.components.result_store import ResultStore  # Import only when results are published
+
+        # The server serves these results to the same dataset and cohorts without running the pipeline again
+        for grade, cohort in cohorts.items():
+            ResultStore().publish((dataset.fingerprint, grade, args.cluster_method), cohort.final_data)
+    if args.export_csv:
+        expand_frame(result.final_data).to_csv(args.export_csv, index=False, header=True)  # CSV is only an export format
+    print(f"Processed {len(result.final_data)} students")  # Print size of the analysed cohort
@@ -1,8 +1,9 @@
-import os 
+import os
 import sys
+import hashlib
+import threading
 import numpy as np
 import pandas as pd
-import dill
 
 from src.exception import CustomException
 
@@ -12,19 +13,77 @@ def save_object(file_path, obj):
 
         os.makedirs(dir_path, exist_ok=True)
 
-        with open(file_path, "wb") as file_obj:
-            dill.dump(obj, file_obj)
+        # Written under a temporary name and renamed, a reader never sees a partly written artifact
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if file_path.endswith('.parquet'):
+                obj.to_parquet(temp_path, index=False)  # Typed columnar file, columns can be read selectively
+            elif file_path.endswith('.feather'):
+                obj.reset_index(drop=True).to_feather(temp_path, compression='uncompressed')  # Uncompressed so it can be memory-mapped
+            elif file_path.endswith('.npy'):
+                with open(temp_path, "wb") as file_obj:
+                    np.save(file_obj, obj, allow_pickle=False)
+            elif file_path.endswith('.npz'):
+                with open(temp_path, "wb") as file_obj:
+                    np.savez(file_obj, **obj)  # Dict of named arrays
+            else:
+                import dill  # Only pickled artifacts need dill
+
+                with open(temp_path, "wb") as file_obj:
+                    dill.dump(obj, file_obj)
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
     except Exception as e:
         raise CustomException(e,sys)
-    
-def load_object(file_path):
+
+def load_object(file_path, columns=None):
     try:
+        if file_path.endswith('.parquet'):
+            return pd.read_parquet(file_path, columns=columns)  # Only the requested columns are decoded
+        if file_path.endswith('.feather'):
+            return pd.read_feather(file_path, columns=columns, memory_map=True)
+        if file_path.endswith('.npy'):
+            return np.load(file_path, mmap_mode='r')  # Pages are loaded lazily as they are read
+        if file_path.endswith('.npz'):
+            with np.load(file_path, allow_pickle=False) as arrays:
+                return dict(arrays)
+
+        import dill  # Only pickled artifacts need dill
+
         with open (file_path, "rb") as file_obj:
             return dill.load(file_obj)
-        
+
     except Exception as e:
         raise CustomException(e, sys)
-        
 
-    
+# Memo of the last computed hash per file path, keyed by file size and modification time
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+def dataset_fingerprint(file_path, chunk_size=1 << 20):
+    " This Function Will Return the SHA-256 of a File, Hashed Again Only When the File Changes"
+    try:
+        stat = os.stat(file_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+
+        with _fingerprints_lock:
+            cached = _fingerprints.get(file_path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_obj:
+            for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()
+
+        with _fingerprints_lock:
+            _fingerprints[file_path] = (stamp, fingerprint)
+
+        return fingerprint
+
+    except Exception as e:
+        raise CustomException(e, sys)
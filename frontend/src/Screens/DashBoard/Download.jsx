@@ -8,8 +8,15 @@ function Download() {
   // Function to handle the download request
   function download(event) {
     event.preventDefault();
+    // Job submitted from the Performance page of this tab, the server only returns the cohort of a named job
+    const jobId = sessionStorage.getItem("jobId");
+    if (!jobId) {
+      console.error("Submit an enrollment number on the Performance page first");
+      return;
+    }
     const url = "https://student-performance-analysis-7du3.onrender.com/download_data";
     const config = {
+      params: { job_id: jobId },
       responseType: "blob", // Set response type to blob for file download
     };
 
@@ -11,6 +11,7 @@ function Performance() {
   const [enr, setEnr] = useState(""); // Enrollment number input
   const [data, setData] = useState(""); // Data fetched from the server
   const [filt, setFilt] = useState(0); // Filter flag
+  const [jobId, setJobId] = useState(sessionStorage.getItem("jobId") || ""); // Job submitted for the enrollment number
 
   // Handle enrollment number input change
   const handleInput = (event) => {
@@ -30,7 +31,11 @@ function Performance() {
     };
     axios
       .post(url, data, config)
-      .then((response) => console.log(response))
+      .then((response) => {
+        console.log(response);
+        setJobId(response.data.job_id);
+        sessionStorage.setItem("jobId", response.data.job_id); // Kept for this tab's Download page
+      })
       .catch((err) => console.log(err));
     setFilt(0);
   };
@@ -38,7 +43,14 @@ function Performance() {
   // Fetch data from the server
   const fetchData = async () => {
     try {
-      const result = await axios.get("https://student-performance-analysis-7du3.onrender.com/fetch_data");
+      const result = await axios.get("https://student-performance-analysis-7du3.onrender.com/fetch_data", {
+        params: { job_id: jobId },
+      });
+      // The job is still queued or running, poll again shortly
+      if (result.status === 202) {
+        setTimeout(fetchData, 500);
+        return;
+      }
       console.log(result);
       console.log(result.data);
       setData(result.data);